@@ -1,64 +1,157 @@
 import streamlit as st
 import pandas as pd
 import os
-from sqlmodel import Field, Session, SQLModel, create_engine, select
-from sqlalchemy.exc import InvalidRequestError
+from sqlmodel import Field, Session, SQLModel
 from openpyxl import Workbook
 from openpyxl.worksheet.datavalidation import DataValidation
 from io import StringIO
 from typing import get_args, get_origin, Union, Optional
-import json
-from pydantic import create_model
-import importlib.util
+from pydantic import Field as PydanticField, create_model
+from sqlalchemy import DateTime, Index
+from sqlalchemy.orm import registry
+import datetime
 import keyword
+import types
+import math
 import re
+import tempfile
+from tools.analytics import (
+    ANALYTICS_ROW_LIMIT,
+    drop_snapshot,
+    get_snapshot_files,
+    is_analytics_available,
+    refresh_snapshot,
+    run_analytic_query,
+)
+from tools.batch_edit import apply_grid_changes, bulk_delete, bulk_update
+from tools.bulk_import import (
+    IMPORT_CHUNK_SIZE,
+    IMPORT_FILE_TYPES,
+    bulk_import,
+    iter_file_chunks,
+)
+from tools.catalog import (
+    delete_database,
+    get_database,
+    list_databases,
+    rename_database,
+    save_database,
+)
+from tools.column_stats import (
+    GROUP_LIMIT,
+    group_by_column,
+    is_numeric,
+    profile_columns,
+)
+from tools.db_filters import FILTER_OPERATORS, compile_filters
+from tools.db_queries import (
+    count_rows,
+    fetch_page,
+    find_keys,
+    find_page_key,
+    find_previous_page_key,
+    row_key,
+)
+from tools.db_indexes import create_index, drop_index, get_index_name, list_indexes
+from tools.db_migrate import (
+    cancel_table_copy,
+    count_unconvertible_values,
+    count_unreadable_dates,
+    find_text_date_columns,
+    has_table_copy,
+    migrate_table,
+    migrate_text_dates,
+    plan_migration,
+)
+from tools.db_engine import (
+    DATABASE_FILE_SUFFIXES,
+    dispose_engine,
+    get_engine,
+    get_pool_stats,
+    run_with_retry,
+    vacuum_database,
+)
+from tools.db_writer import (
+    GROUP_COMMIT_WINDOW,
+    get_writer_stats,
+    is_group_commit_enabled,
+    run_grouped_write,
+    set_group_commit,
+    stop_writer,
+)
+from tools.db_search import (
+    SEARCH_RESULT_LIMIT,
+    ensure_search_index,
+    get_search_columns,
+    rebuild_search_index,
+    search_records,
+)
+from tools.db_stats import ensure_table_stats, get_table_stats, refresh_table_stats
+from tools.db_changes import (
+    CHANGE_CHECK_INTERVAL,
+    check_for_changes,
+    mark_data_changed,
+)
+from tools.db_arrow import to_dataframe
+from tools.export import (
+    EXPORT_FORMATS,
+    EXPORTS_DIR,
+    export_table,
+    remove_old_exports,
+)
+from tools.jobs import (
+    ACTIVE_JOB_STATUSES,
+    get_job,
+    has_active_jobs,
+    list_jobs,
+    submit_job,
+)
+from tools.model_registry import forget_model, get_model_build_stats, get_schema_model
+from tools.query_cache import (
+    bump_data_version,
+    cached_queries,
+    cached_query,
+    get_query_cache_stats,
+)
+
+PAGE_SIZE_OPTIONS = [25, 50, 100, 250, 500]
+
+# Number of matching keys offered at a time when looking up a record
+LOOKUP_LIMIT = 20
+
+# Largest export offered for download through the browser. The download
+# button holds the whole file in server memory, so bigger exports are only
+# kept on disk
+EXPORT_DOWNLOAD_MAX_BYTES = 200 * 1024 * 1024
+
+# Seconds between two status updates of the jobs panel while jobs are running
+JOB_POLL_SECONDS = 2
+
+# Seconds between two checks for changes made by other sessions or processes
+CHANGE_POLL_SECONDS = 3
+
+# Types of the generated model fields, by type hint
+MODEL_TYPES = {
+    "int": int,
+    "float": float,
+    "str": str,
+    "bool": bool,
+    "date": datetime.date,
+    "datetime": datetime.datetime,
+}
+
+
+def get_db_file(db_name):
+    return os.path.join("databases", f"{db_name}.db")
 
 
 def get_db_engine(db_name):
-    # Create a database engine
+    # Get the database engine shared by all sessions
     db_dir = "databases"
     if not os.path.exists(db_dir):
         os.makedirs(db_dir)
 
-    db_file = os.path.join(db_dir, f"{db_name}.db")
-    if "engines" not in st.session_state:
-        st.session_state["engines"] = {}
-    if db_name not in st.session_state["engines"]:
-        st.session_state["engines"][db_name] = create_engine(f"sqlite:///{db_file}")
-    return st.session_state["engines"][db_name]
-
-
-def import_generated_models():
-    """
-    Imports the generated model classes from the models directory.
-    """
-    models_dir = "models"
-    if not st.session_state.get("imported_db_classes") or not os.path.exists(
-        models_dir
-    ):
-        st.session_state["imported_db_classes"] = {}
-    else:
-        if "engines" not in st.session_state:
-            st.session_state["engines"] = {}
-        model_files = [f for f in os.listdir(models_dir) if f.endswith(".py")]
-        for model_file_name in model_files:
-            if model_file_name.endswith("__init__.py"):
-                continue
-            db_name = model_file_name.replace(".py", "")
-            model_name = f"{db_name}_model"
-            db_path = os.path.join(models_dir, model_file_name)
-            if model_name not in st.session_state["imported_db_classes"]:
-                st.session_state["imported_db_classes"][model_name] = (
-                    import_model_class(db_path, model_name)
-                )
-            if model_name not in st.session_state["engines"]:
-                st.session_state["engines"][model_name] = get_db_engine(db_name)
-
-
-if "imported_db_classes" not in st.session_state:
-    import_generated_models()
-
-## ADD Engine to the Session State to avoid multiple connections
+    return get_engine(get_db_file(db_name))
 
 
 def generate_excel_template():
@@ -70,18 +163,27 @@ def generate_excel_template():
     ws["A1"] = (
         "Instructions: Fill out the field names and select data types from the list."
     )
-    ws.merge_cells("A1:B1")
+    ws.merge_cells("A1:F1")
     ws["A2"] = "Field Name"
     ws["B2"] = "Data Type"
+    ws["C2"] = "Indexed"
+    ws["D2"] = "Unique"
+    ws["E2"] = "Index Group"
+    ws["F2"] = "Searchable"
 
     # Provide some placeholder entries
     ws["A3"] = "id"
     ws["B3"] = "integer"
+    ws["C3"] = "no"
+    ws["D3"] = "no"
     ws["A4"] = "name"
     ws["B4"] = "string"
+    ws["C4"] = "yes"
+    ws["D4"] = "no"
+    ws["F4"] = "yes"
 
     # Define the data type list
-    data_types = ["string", "integer", "float", "date"]
+    data_types = ["string", "integer", "float", "date", "datetime"]
     data_type_str = ",".join(data_types)
 
     # Create a data validation object
@@ -89,6 +191,13 @@ def generate_excel_template():
     ws.add_data_validation(dv)
     dv.add("B3:B1048576")  # Apply to column B
 
+    # Indexed, Unique and Searchable are yes/no. Fields sharing an Index
+    # Group name are indexed together, in the order they are listed.
+    yes_no = DataValidation(type="list", formula1='"yes,no"', allow_blank=True)
+    ws.add_data_validation(yes_no)
+    yes_no.add("C3:D1048576")
+    yes_no.add("F3:F1048576")
+
     # Protect the header row to prevent edits
 
     # Save the workbook to a BytesIO stream
@@ -97,6 +206,33 @@ def generate_excel_template():
     return "database_schema_template.xlsx"
 
 
+def is_checked(value):
+    """
+    Reads a yes/no cell of the template. Empty cells are "no".
+    """
+    if isinstance(value, str):
+        return value.strip().lower() in ("yes", "y", "true", "x", "1")
+    return not pd.isna(value) and bool(value)
+
+
+def get_index_options(row):
+    """
+    Reads the optional Indexed, Unique, Index Group and Searchable cells of a
+    schema row. Schemas made from older templates lack some or all of them.
+    """
+    index_group = row.get("Index Group")
+    if pd.isna(index_group) or not str(index_group).strip():
+        index_group = None
+    else:
+        index_group = str(index_group).strip()
+    return {
+        "index": is_checked(row.get("Indexed")),
+        "unique": is_checked(row.get("Unique")),
+        "index_group": index_group,
+        "searchable": is_checked(row.get("Searchable")),
+    }
+
+
 def create_pydantic_model(schema_df, model_name):
     # Prepare fields for the Pydantic model
     fields = {}
@@ -105,86 +241,234 @@ def create_pydantic_model(schema_df, model_name):
         data_type = row["Data Type"].lower().strip()
 
         if data_type == "string":
-            field_type = (Optional[str], None)
+            field_type = Optional[str]
         elif data_type == "integer":
-            field_type = (Optional[int], None)
+            field_type = Optional[int]
         elif data_type == "float":
-            field_type = (Optional[float], None)
+            field_type = Optional[float]
         elif data_type == "date":
-            field_type = (
-                Optional[str],
-                None,
-            )  # Dates can be handled as strings or date objects
+            field_type = Optional[datetime.date]
+        elif data_type == "datetime":
+            field_type = Optional[datetime.datetime]
         else:
             st.error(f"Unsupported data type: {data_type}")
             continue
 
-        fields[field_name] = field_type
+        # The index options travel with the field to the SQLModel class
+        fields[field_name] = (
+            field_type,
+            PydanticField(default=None, json_schema_extra=get_index_options(row)),
+        )
 
     # Create Pydantic model
     pydantic_model = create_model(model_name, **fields)
     return pydantic_model
 
 
-def save_model_to_file(pydantic_model, model_name, db_name, primary_keys):
+def get_model_fields(pydantic_model, primary_keys, warn=False):
     """
-    Saves the Pydantic model as a SQLModel class to a Python file.
-    Ensures that field names are valid Python identifiers and that
-    type hints are correctly mapped.
+    Lists the fields of the SQLModel class generated from a Pydantic model.
+    Ensures that field names are valid Python identifiers.
 
     Args:
         pydantic_model: The Pydantic model to be converted.
-        model_name: Name of the model class.
-        db_name: Name of the database.
         primary_keys: List of primary key fields.
+        warn: Show a warning for every field name that had to be changed.
 
     Returns:
-        The path to the model file.
+        A list of (field name, field type, is primary key, index options)
+        tuples.
     """
-    # Directory to save model files
-    models_dir = "models"
-    if not os.path.exists(models_dir):
-        os.makedirs(models_dir)
-
-    model_file = os.path.join(models_dir, f"{db_name}.py")
-
-    # Start building the model code
-    model_code = "from sqlmodel import Field, SQLModel\n"
-    model_code += "from typing import Optional\n\n"
-    model_code += f"class {model_name}(SQLModel, table=True):\n"
-
-    # Process each field in the Pydantic model
+    model_fields = []
     for field_name, field_type in pydantic_model.__annotations__.items():
+        index_options = pydantic_model.model_fields[field_name].json_schema_extra
         # Sanitize the field name
         sanitized_field_name = sanitize_field_name(field_name)
         if sanitized_field_name != field_name:
-            st.warning(
-                f"Field name '{field_name}' has been changed to '{sanitized_field_name}' to be a valid Python identifier."
-            )
+            if warn:
+                st.warning(
+                    f"Field name '{field_name}' has been changed to '{sanitized_field_name}' to be a valid Python identifier."
+                )
             field_name = sanitized_field_name
 
-        # Get the type hint as a string
-        type_hint = get_type_hint(field_type)
-
         # Check if the field is a primary key
         is_primary_key = field_name in primary_keys
+        model_fields.append((field_name, field_type, is_primary_key, index_options))
+    return model_fields
+
+
+def get_field_options(is_primary_key, index_options, field_type=None):
+    """
+    Returns the keyword arguments of the ``Field`` of a model column.
+    Primary keys are already indexed, so their index options are ignored.
+    Searchable columns are marked in the column info, see
+    ``tools.db_search``. Datetimes are stored without a time zone, whatever
+    the SQLModel version would default to.
+    """
+    if is_primary_key:
+        field_options = {"primary_key": True}
+    else:
+        field_options = {"default": None}
+        if index_options["index"]:
+            field_options["index"] = True
+        if index_options["unique"]:
+            field_options["unique"] = True
+    if index_options.get("searchable"):
+        field_options["sa_column_kwargs"] = {"info": {"searchable": True}}
+    if get_date_type(field_type) is datetime.datetime:
+        field_options["sa_type"] = DateTime
+    return field_options
+
+
+def get_index_groups(model_name, model_fields):
+    """
+    Collects the fields sharing an Index Group into composite indexes.
+
+    Returns:
+        A dict of {index name: [field names]}.
+    """
+    index_groups = {}
+    for field_name, _, _, index_options in model_fields:
+        if index_options["index_group"]:
+            index_name = get_index_name(
+                model_name, [sanitize_field_name(index_options["index_group"])]
+            )
+            index_groups.setdefault(index_name, []).append(field_name)
+    return index_groups
+
+
+def generate_model_code(pydantic_model, model_name, primary_keys):
+    """
+    Renders the SQLModel class of a Pydantic model as Python source.
+
+    Args:
+        pydantic_model: The Pydantic model to be converted.
+        model_name: Name of the model class.
+        primary_keys: List of primary key fields.
+
+    Returns:
+        The model code.
+    """
+    model_fields = get_model_fields(pydantic_model, primary_keys)
+    type_hints = {get_type_hint(field_type) for _, field_type, _, _ in model_fields}
+    date_types = [
+        name
+        for name in ("date", "datetime")
+        if {name, f"Optional[{name}]"} & type_hints
+    ]
+
+    # Start building the model code. Each model gets its own registry and
+    # MetaData so that its table is isolated from the other databases.
+    model_code = ""
+    if date_types:
+        model_code += f"from datetime import {', '.join(date_types)}\n"
+    if "datetime" in date_types:
+        model_code += "from sqlalchemy import DateTime, Index\n"
+    else:
+        model_code += "from sqlalchemy import Index\n"
+    model_code += "from sqlalchemy.orm import registry\n"
+    model_code += "from sqlmodel import Field, SQLModel\n"
+    model_code += "from typing import Optional\n\n"
+    model_code += "class Base(SQLModel, registry=registry()):\n"
+    model_code += "    pass\n\n"
+    model_code += f"class {model_name}(Base, table=True):\n"
+
+    index_groups = get_index_groups(model_name, model_fields)
+    if index_groups:
+        model_code += "    __table_args__ = (\n"
+        for index_name, field_names in index_groups.items():
+            columns = ", ".join(repr(field_name) for field_name in field_names)
+            model_code += f"        Index({index_name!r}, {columns}),\n"
+        model_code += "    )\n"
+
+    for field_name, field_type, is_primary_key, index_options in model_fields:
+        # Get the type hint as a string
+        type_hint = get_type_hint(field_type)
 
         # Build the field definition
-        if is_primary_key:
-            field_def = f"    {field_name}: {type_hint} = Field(primary_key=True)"
-        else:
-            field_def = f"    {field_name}: {type_hint} = Field(default=None)"
+        field_options = ", ".join(
+            f"{name}={value.__name__ if isinstance(value, type) else repr(value)}"
+            for name, value in get_field_options(
+                is_primary_key, index_options, field_type
+            ).items()
+        )
+        field_def = f"    {field_name}: {type_hint} = Field({field_options})"
 
         # Add the field definition to the model code
         model_code += f"{field_def}\n"
 
+    return model_code
+
+
+def save_model_to_file(pydantic_model, model_name, db_name, primary_keys):
+    """
+    Saves the Pydantic model as a SQLModel class to a Python file. The file
+    is only an export; the app builds its models in memory.
+
+    Args:
+        pydantic_model: The Pydantic model to be converted.
+        model_name: Name of the model class.
+        db_name: Name of the database.
+        primary_keys: List of primary key fields.
+
+    Returns:
+        The path to the model file.
+    """
+    # Directory to save model files
+    models_dir = "models"
+    if not os.path.exists(models_dir):
+        os.makedirs(models_dir)
+
+    model_file = os.path.join(models_dir, f"{db_name}.py")
+
     # Save the model code to the file
     with open(model_file, "w") as f:
-        f.write(model_code)
+        f.write(generate_model_code(pydantic_model, model_name, primary_keys))
 
     return model_file
 
 
+def build_model_class(pydantic_model, model_name, primary_keys, text_columns=()):
+    """
+    Builds the SQLModel table class of a Pydantic model in memory. The class
+    is the same as the one ``generate_model_code`` renders, including its
+    own registry and MetaData.
+
+    Args:
+        pydantic_model: The Pydantic model to be converted.
+        model_name: Name of the model class.
+        primary_keys: List of primary key fields.
+        text_columns: Date fields kept as text, for tables created before
+            the native date types. They are listed in the table info under
+            "text_date_columns".
+
+    Returns:
+        The SQLModel class.
+    """
+    base = types.new_class("Base", (SQLModel,), {"registry": registry()})
+    namespace = {"__module__": __name__, "__annotations__": {}}
+    model_fields = get_model_fields(pydantic_model, primary_keys)
+    index_groups = get_index_groups(model_name, model_fields)
+    if index_groups:
+        namespace["__table_args__"] = tuple(
+            Index(index_name, *field_names)
+            for index_name, field_names in index_groups.items()
+        )
+    for field_name, field_type, is_primary_key, index_options in model_fields:
+        if field_name in text_columns:
+            field_type = Optional[str]
+        namespace["__annotations__"][field_name] = get_type(field_type)
+        namespace[field_name] = Field(
+            **get_field_options(is_primary_key, index_options, field_type)
+        )
+
+    model_class = types.new_class(
+        model_name, (base,), {"table": True}, lambda ns: ns.update(namespace)
+    )
+    model_class.__table__.info["text_date_columns"] = list(text_columns)
+    return model_class
+
+
 def sanitize_field_name(field_name):
     """
     Sanitizes the field name to ensure it is a valid Python identifier.
@@ -245,6 +529,21 @@ def get_type_hint(field_type):
         return get_type_str(field_type)
 
 
+def get_type(field_type):
+    """
+    Maps a field type to the type used in the generated model, matching the
+    type hint ``get_type_hint`` renders for it.
+    """
+    origin = get_origin(field_type)
+    args = get_args(field_type)
+
+    if origin is Union and type(None) in args:
+        actual_type = [arg for arg in args if arg is not type(None)][0]
+        return Optional[MODEL_TYPES[get_type_str(actual_type)]]
+    else:
+        return MODEL_TYPES[get_type_str(field_type)]
+
+
 def get_type_str(field_type):
     """
     Maps a Python type to its string representation for code generation.
@@ -263,130 +562,1497 @@ def get_type_str(field_type):
         return "str"
     elif field_type is bool:
         return "bool"
+    elif field_type is datetime.datetime:
+        return "datetime"
+    elif field_type is datetime.date:
+        return "date"
     else:
         # Default to 'str' for unsupported types
         return "str"
 
 
-def import_model_class(model_file_path, model_name):
-    # Import the model class from the model file
-    spec = importlib.util.spec_from_file_location(model_name, model_file_path)
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    model_class = getattr(module, model_name)
+def create_model_table(db_name, model_class):
+    """
+    Creates the table of a model, its stats and its full-text index in its
+    database if needed. Only this model's table is checked and created.
+    """
+    engine = get_db_engine(db_name)
+    model_class.metadata.create_all(engine, tables=[model_class.__table__])
+    ensure_table_stats(engine, model_class)
+    ensure_search_index(engine, model_class)
 
-    # Handle table already defined error
-    try:
-        SQLModel.metadata.create_all(
-            get_db_engine(db_name=model_name.replace("_model", ""))
-        )  # Create tables if not already created
-    except InvalidRequestError as e:
-        if "already defined" in str(e):
-            print(
-                f"Table '{model_name}' is already defined. Returning the existing model class."
-            )
-        else:
-            raise e  # If it's another error, re-raise the exception
 
-    return model_class
+def load_model_class(catalog_entry):
+    """
+    Returns the model class of a catalogued database. The class is built in
+    memory from the catalogued schema the first time it is used in the
+    process and shared by all sessions until the schema changes.
+    """
+    db_name = catalog_entry["name"]
+    model_name = catalog_entry["table_name"]
+
+    def build():
+        schema_df = pd.read_json(StringIO(catalog_entry["schema_json"]))
+        pydantic_model = create_pydantic_model(schema_df, model_name)
+        # Tables created before the native date types keep their text dates
+        # until they are converted, see render_date_migration
+        date_columns = [
+            column
+            for _, column, data_type in get_schema_columns(schema_df)
+            if data_type in ("date", "datetime")
+        ]
+        # SQLModel names the table after the lowercased class name
+        text_columns = find_text_date_columns(
+            get_db_engine(db_name), model_name.lower(), date_columns
+        )
+        return build_model_class(
+            pydantic_model, model_name, catalog_entry["primary_keys"], text_columns
+        )
+
+    return get_schema_model(
+        model_name,
+        catalog_entry["schema_json"],
+        catalog_entry["primary_keys"],
+        build,
+        on_build=lambda model_class: create_model_table(db_name, model_class),
+    )
 
 
-def generate_database(db_name, schema_df, primary_keys, description):
+def generate_database(
+    db_name, schema_df, primary_keys, description, save_model_file=False
+):
     # Create Pydantic model
     model_name = f"{db_name}_model"
     pydantic_model = create_pydantic_model(schema_df, model_name)
+    get_model_fields(pydantic_model, primary_keys, warn=True)
+
+    # Optionally export the model as a Python file
+    if save_model_file:
+        save_model_to_file(pydantic_model, model_name, db_name, primary_keys)
+
+    # Save the schema, primary keys and description to the catalog
+    schema_json = schema_df.to_json()
+    save_database(
+        db_name,
+        model_name,
+        schema_json,
+        primary_keys,
+        description,
+        get_db_file(db_name),
+    )
+
+    # Build the SQLModel class in memory and create the database
+    model_class = get_schema_model(
+        model_name,
+        schema_json,
+        primary_keys,
+        lambda: build_model_class(pydantic_model, model_name, primary_keys),
+    )
+    create_model_table(db_name, model_class)
+
+    return model_class
+
+
+def get_page_state(db_name):
+    """
+    Returns the pagination state of a database, stored in the session state.
+    """
+    if "record_pages" not in st.session_state:
+        st.session_state["record_pages"] = {}
+    if db_name not in st.session_state["record_pages"]:
+        st.session_state["record_pages"][db_name] = {
+            "page": 1,
+            "page_size": PAGE_SIZE_OPTIONS[0],
+            "after_key": None,
+        }
+    return st.session_state["record_pages"][db_name]
+
 
-    # Save model to file and convert to SQLModel
-    model_file = save_model_to_file(pydantic_model, model_name, db_name, primary_keys)
+def reset_page_state(page_state):
+    page_state["page"] = 1
+    page_state["after_key"] = None
 
-    # Import the SQLModel class from the file
-    if model_name in st.session_state["imported_db_classes"]:
-        print(model_name, "found in session state.")
-        model_class = st.session_state["imported_db_classes"][model_name]
+
+def reset_record_views(db_name):
+    """
+    Drops the applied filters and sort, the filter widgets, the grid editor
+    state and the page position of a database. They name columns of its
+    schema, so they no longer apply once the table is migrated.
+    """
+    for key in list(st.session_state):
+        if key.startswith((f"{db_name}_filter_", f"{db_name}_grid_")):
+            del st.session_state[key]
+    st.session_state.pop(f"{db_name}_record_filters", None)
+    reset_page_state(get_page_state(db_name))
+
+
+def go_to_next_page(page_state, last_key):
+    page_state["page"] += 1
+    page_state["after_key"] = last_key
+
+
+def go_to_previous_page(
+    page_state, engine, model_class, key_names, first_key, filters=(), sort=None
+):
+    page_state["page"] = max(page_state["page"] - 1, 1)
+    page_state["after_key"] = find_previous_page_key(
+        engine,
+        model_class,
+        key_names,
+        page_state["page_size"],
+        first_key,
+        compile_filters(model_class, filters),
+        sort,
+    )
+    if page_state["after_key"] is None:
+        page_state["page"] = 1
+
+
+def jump_to_page(
+    page_state, engine, model_class, key_names, jump_key, filters=(), sort=None
+):
+    page_number = int(st.session_state[jump_key])
+    found, after_key = find_page_key(
+        engine,
+        model_class,
+        key_names,
+        page_state["page_size"],
+        page_number,
+        compile_filters(model_class, filters),
+        sort,
+    )
+    if found:
+        page_state["page"] = page_number
+        page_state["after_key"] = after_key
     else:
-        print(model_name, "not found in session state. Importing from file.")
-        model_class = import_model_class(model_file, model_name)
-        st.session_state["imported_db_classes"][model_name] = model_class
+        st.session_state["page_jump_error"] = f"Page {page_number} does not exist."
 
-    # Create the database
-    # Save the schema to a JSON file
-    schemas_dir = "schemas"
-    if not os.path.exists(schemas_dir):
-        os.makedirs(schemas_dir)
 
-    schema_json = schema_df.to_json()
-    schema_file = os.path.join(schemas_dir, f"{db_name}_schema.json")
-    with open(schema_file, "w") as f:
-        f.write(schema_json)
+def get_schema_columns(schema_df):
+    """
+    Lists the columns of a schema.
 
-    # Save primary keys
-    pk_file = os.path.join(schemas_dir, f"{db_name}_pk.json")
-    with open(pk_file, "w") as f:
-        json.dump(primary_keys, f)
+    Returns:
+        A list of (field name, column name, data type) tuples, where the
+        column name is the sanitized name used in the table.
+    """
+    columns = []
+    for _, row in schema_df.iterrows():
+        field_name = str(row["Field Name"]).strip()
+        data_type = str(row["Data Type"]).lower().strip()
+        columns.append((field_name, sanitize_field_name(field_name), data_type))
+    return columns
 
-    # Save description
-    desc_file = os.path.join(schemas_dir, f"{db_name}_desc.txt")
-    with open(desc_file, "w") as f:
-        f.write(description)
 
-    return model_class
+def render_bulk_import(db_name, engine, model_class, schema_df, key_names):
+    """
+    Imports a CSV, Excel or Parquet file into the database in chunks, as a
+    background job.
+    """
+    schema_columns = get_schema_columns(schema_df)
+    # Dates of tables not yet converted to native dates are imported as text
+    text_columns = model_class.__table__.info.get("text_date_columns", [])
+    column_types = {
+        column: "string" if column in text_columns else data_type
+        for _, column, data_type in schema_columns
+    }
+    field_names = {field_name: column for field_name, column, _ in schema_columns}
+
+    job_key = f"{db_name}_import_job"
+    job = get_job(st.session_state[job_key]) if job_key in st.session_state else None
+    if job is not None:
+        if job["status"] == "succeeded":
+            show_import_summary(db_name, job["result"])
+        elif job["status"] in ACTIVE_JOB_STATUSES:
+            st.info("The import is running, see Background Jobs.")
+        else:
+            st.error(f"Error importing data: {job['error']}")
 
+    with st.form(f"{db_name}_bulk_import_form"):
+        uploaded_file = st.file_uploader(
+            "Upload a data file:", type=IMPORT_FILE_TYPES, key=f"{db_name}_import"
+        )
+        chunk_size = st.number_input(
+            "Rows per batch",
+            min_value=1000,
+            max_value=1000000,
+            value=IMPORT_CHUNK_SIZE,
+            step=1000,
+        )
+        # Jobs of a database run one at a time, see Background Jobs
+        submitted = st.form_submit_button(
+            "Import Data", disabled=has_active_jobs(db_name)
+        )
 
-def interact_with_database(db_name):
-    st.header(f"Interact with Database: {normalize_db_name(db_name)}")
+    if not submitted:
+        return
+    if uploaded_file is None:
+        st.error("Upload a file to import.")
+        return
+    source, file_name = uploaded_file, uploaded_file.name
+
+    def run_import(report):
+        def show_progress(summary):
+            report(
+                summary["fraction"],
+                f"Read {summary['rows_read']:,} rows: "
+                f"{summary['inserted']:,} inserted, "
+                f"{summary['duplicates']:,} duplicates, "
+                f"{summary['rejected']:,} rejected "
+                f"({summary['rows_per_second']:,.0f} rows per second)",
+            )
+
+        try:
+            summary = bulk_import(
+                engine,
+                model_class,
+                iter_file_chunks(source, file_name, int(chunk_size)),
+                column_types,
+                field_names,
+                key_names,
+                progress=show_progress,
+            )
+        finally:
+            mark_data_changed(engine, model_class, db_name)
+        # The job result is stored as JSON, so the rejected rows go to a file
+        rejected_rows = summary.pop("rejected_rows")
+        summary["rejected_path"] = None
+        if len(rejected_rows):
+            os.makedirs(EXPORTS_DIR, exist_ok=True)
+            file_descriptor, path = tempfile.mkstemp(
+                prefix=f"{db_name}_rejected_", suffix=".csv", dir=EXPORTS_DIR
+            )
+            os.close(file_descriptor)
+            rejected_rows.to_csv(path, index=False)
+            summary["rejected_path"] = path
+        return summary
+
+    # Files of abandoned sessions would otherwise pile up
+    remove_old_exports()
+    st.session_state[job_key] = submit_job(
+        db_name, "import", f"Import {os.path.basename(file_name)}", run_import
+    )
+    st.rerun()
+
+
+def show_import_summary(db_name, summary):
+    st.success(
+        f"Imported {summary['inserted']:,} of {summary['rows_read']:,} rows "
+        f"in {summary['seconds']:.1f} seconds "
+        f"({summary['rows_per_second']:,.0f} rows per second)."
+    )
+    if summary["duplicates"]:
+        st.info(f"{summary['duplicates']:,} rows already existed and were skipped.")
+    rejected_path = summary["rejected_path"]
+    if rejected_path and os.path.exists(rejected_path):
+        rejected_rows = pd.read_csv(rejected_path, dtype=str)
+        st.warning(
+            f"{summary['rejected']:,} rows were rejected. "
+            f"The first {len(rejected_rows):,} are shown below."
+        )
+        st.dataframe(rejected_rows)
+        with open(rejected_path, "rb") as f:
+            st.download_button(
+                "Download Rejected Rows",
+                data=f,
+                file_name=f"{db_name}_rejected_rows.csv",
+                mime="text/csv",
+            )
+
+
+def render_export(db_name, engine, model_class, key_names, row_count):
+    """
+    Exports the table to CSV or Parquet through a temp file written in
+    primary key ordered chunks by a background job, then offers it for
+    download.
+    """
+    export_key = f"{db_name}_export_job"
+    export = (
+        get_job(st.session_state[export_key])
+        if export_key in st.session_state
+        else None
+    )
+    export_running = export is not None and export["status"] in ACTIVE_JOB_STATUSES
+    export_format = st.selectbox(
+        "Export format", options=list(EXPORT_FORMATS), key=f"{db_name}_export_format"
+    )
+    if st.button(
+        "Prepare Export", key=f"{db_name}_prepare_export", disabled=export_running
+    ):
+        # Only keep the latest export of a database on disk
+        if export is not None and export["result"]:
+            if os.path.exists(export["result"]["path"]):
+                os.remove(export["result"]["path"])
+
+        def run_export(report):
+            summary = export_table(
+                engine,
+                model_class,
+                key_names,
+                export_format,
+                total_rows=row_count,
+                progress=lambda rows_written, fraction: report(
+                    fraction, f"Exported {rows_written:,} rows"
+                ),
+            )
+            summary["format"] = export_format
+            return summary
 
-    # Load the schema
-    schemas_dir = "schemas"
-    schema_file = os.path.join(schemas_dir, f"{db_name}_schema.json")
-    pk_file = os.path.join(schemas_dir, f"{db_name}_pk.json")
-    desc_file = os.path.join(schemas_dir, f"{db_name}_desc.txt")
+        remove_old_exports()
+        st.session_state[export_key] = submit_job(
+            db_name, "export", f"Export to {export_format}", run_export
+        )
+        st.rerun()
 
-    if not os.path.exists(schema_file):
-        st.error("Schema file not found.")
+    if export is None:
         return
-    if not os.path.exists(pk_file):
-        st.error("Primary key file not found.")
+    if export_running:
+        st.info("The export is being prepared, see Background Jobs.")
+    elif export["status"] != "succeeded":
+        st.error(f"Error exporting data: {export['error']}")
+    elif os.path.exists(export["result"]["path"]):
+        summary = export["result"]
+        file_size = os.path.getsize(summary["path"])
+        st.write(
+            f"Exported {summary['rows']:,} records to {summary['format']} "
+            f"({file_size / 1024 / 1024:.1f} MB) in {summary['seconds']:.1f} seconds."
+        )
+        if file_size > EXPORT_DOWNLOAD_MAX_BYTES:
+            st.warning(
+                f"The file is larger than "
+                f"{EXPORT_DOWNLOAD_MAX_BYTES / 1024 / 1024:.0f} MB, too large to "
+                f"download through the browser. It is kept on the server as "
+                f"{os.path.basename(summary['path'])} in the {EXPORTS_DIR} folder."
+            )
+            return
+        # The file is only read into memory for the run drawing the button,
+        # not on every rerun of the page
+        if not st.button("Load Download", key=f"{db_name}_load_export"):
+            return
+        export_format = EXPORT_FORMATS[summary["format"]]
+        with open(summary["path"], "rb") as f:
+            data = f.read()
+        st.download_button(
+            label=f"Download {summary['format']}",
+            data=data,
+            file_name=f"{db_name}.{export_format['extension']}",
+            mime=export_format["mime"],
+            key=f"{db_name}_download_export",
+        )
+
+
+def load_page(
+    db_name,
+    engine,
+    model_class,
+    key_names,
+    page_size,
+    after_key=None,
+    filters=(),
+    sort=None,
+):
+    """
+    Fetches a page of records through the query cache.
+    """
+    query_key = (
+        "page",
+        tuple(key_names),
+        page_size,
+        tuple(after_key) if after_key is not None else None,
+        filters,
+        sort,
+    )
+    return cached_query(
+        db_name,
+        query_key,
+        lambda: fetch_page(
+            engine,
+            model_class,
+            key_names,
+            page_size,
+            after_key,
+            compile_filters(model_class, filters),
+            sort,
+        ),
+    )
+
+
+def render_search(db_name, engine, model_class):
+    """
+    Searches the searchable columns through their FTS5 index and shows the
+    best matches.
+    """
+    search_columns = get_search_columns(model_class)
+    search_text = st.text_input(
+        f"Search {', '.join(search_columns)}",
+        key=f"{db_name}_search",
+        help="Every word must match; words match as prefixes.",
+    )
+    if search_text.strip():
+        try:
+            result = cached_query(
+                db_name,
+                ("search", search_text, SEARCH_RESULT_LIMIT),
+                lambda: search_records(engine, model_class, search_text),
+            )
+        except Exception as e:
+            st.error(f"Error searching records: {e}")
+        else:
+            st.write(
+                f"{len(result['rows'])} best matches in "
+                f"{result['seconds'] * 1000:.1f} ms"
+            )
+            if result["rows"]:
+                st.dataframe(pd.DataFrame(result["rows"]))
+    if st.button("Rebuild Search Index", key=f"{db_name}_rebuild_search"):
+        rebuild_search_index(engine, model_class)
+        mark_data_changed(engine, model_class, db_name)
+        st.rerun()
+
+
+def render_record_filters(db_name, schema_df):
+    """
+    Builds the filters and the sort order of the record browser from the
+    schema types. They are compiled to SQL and run inside SQLite, so only
+    the matching records are read.
+
+    Returns:
+        A tuple of (filters, sort), see ``tools.db_filters``.
+    """
+    filters_key = f"{db_name}_record_filters"
+    widget_prefix = f"{db_name}_filter_"
+    applied = st.session_state.get(filters_key, {"filters": (), "sort": None})
+    schema_columns = get_schema_columns(schema_df)
+
+    with st.expander("Filter and Sort", expanded=bool(applied["filters"])):
+        with st.form(f"{db_name}_filter_form"):
+            filters = []
+            for field_name, column, data_type in schema_columns:
+                operators = FILTER_OPERATORS.get(data_type)
+                if operators is None:
+                    continue
+                key = f"{widget_prefix}{column}"
+                col_operator, col_low, col_high = st.columns(3)
+                if operators == ["between"]:
+                    step = 1 if data_type == "integer" else None
+                    with col_low:
+                        low = st.number_input(
+                            f"{field_name} from",
+                            value=None,
+                            step=step,
+                            key=f"{key}_low",
+                        )
+                    with col_high:
+                        high = st.number_input(
+                            f"{field_name} to", value=None, step=step, key=f"{key}_high"
+                        )
+                elif operators == ["between dates"]:
+                    with col_low:
+                        low = st.date_input(
+                            f"{field_name} from",
+                            value=None,
+                            min_value=datetime.date(1900, 1, 1),
+                            key=f"{key}_low",
+                        )
+                    with col_high:
+                        high = st.date_input(
+                            f"{field_name} to",
+                            value=None,
+                            min_value=datetime.date(1900, 1, 1),
+                            key=f"{key}_high",
+                        )
+                else:
+                    with col_operator:
+                        operator = st.selectbox(
+                            field_name, options=operators, key=f"{key}_operator"
+                        )
+                    with col_low:
+                        text = st.text_input(f"{field_name} value", key=f"{key}_value")
+                    if text:
+                        filters.append((column, operator, text))
+                    continue
+                if low is not None or high is not None:
+                    filters.append((column, operators[0], (low, high)))
+
+            sort_options = [None] + [column for _, column, _ in schema_columns]
+            col_sort, col_order = st.columns(2)
+            with col_sort:
+                sort_column = st.selectbox(
+                    "Sort by",
+                    options=sort_options,
+                    format_func=lambda option: option or "Primary key",
+                    key=f"{widget_prefix}sort",
+                )
+            with col_order:
+                descending = st.radio(
+                    "Order",
+                    options=[False, True],
+                    format_func=lambda option: "Descending" if option else "Ascending",
+                    horizontal=True,
+                    key=f"{widget_prefix}descending",
+                )
+
+            col_apply, col_clear = st.columns(2)
+            with col_apply:
+                apply = st.form_submit_button("Apply")
+            with col_clear:
+                clear = st.form_submit_button("Clear")
+
+    if apply:
+        sort = (sort_column, descending) if sort_column else None
+        applied = {"filters": tuple(filters), "sort": sort}
+        st.session_state[filters_key] = applied
+        reset_page_state(get_page_state(db_name))
+    elif clear:
+        for key in list(st.session_state):
+            if key.startswith(widget_prefix):
+                del st.session_state[key]
+        st.session_state.pop(filters_key, None)
+        reset_page_state(get_page_state(db_name))
+        st.rerun()
+
+    return applied["filters"], applied["sort"]
+
+
+def render_bulk_changes(db_name, engine, model_class, key_names, filters, row_count):
+    """
+    Updates or deletes every record matching the applied filters with one
+    set-based statement. The records are never loaded into Python.
+    """
+    summary_key = f"{db_name}_bulk_summary"
+    if summary_key in st.session_state:
+        st.success(st.session_state.pop(summary_key))
+
+    if filters:
+        st.write(f"Applies to the **{row_count}** records matching the filters.")
+    else:
+        st.write(
+            f"No filters are applied, so this applies to all **{row_count}** "
+            "records. Use Filter and Sort above to narrow it down."
+        )
+
+    operation = st.radio(
+        "Operation",
+        options=["Update", "Delete"],
+        horizontal=True,
+        key=f"{db_name}_bulk_operation",
+    )
+    values = None
+    if operation == "Update":
+        table = model_class.__table__
+        column_name = st.selectbox(
+            "Column to set",
+            options=[
+                column.name for column in table.columns if column.name not in key_names
+            ],
+            key=f"{db_name}_bulk_column",
+        )
+        if column_name is None:
+            st.write("There are no columns to update besides the primary key.")
+            return
+        set_null = st.checkbox("Set to empty (NULL)", key=f"{db_name}_bulk_null")
+        value = None
+        if not set_null:
+            column_type = table.c[column_name].type.python_type
+            if column_type is int:
+                value = st.number_input(
+                    "New value", step=1, key=f"{db_name}_bulk_value_int"
+                )
+            elif column_type is float:
+                value = st.number_input("New value", key=f"{db_name}_bulk_value_float")
+            elif column_type in (datetime.date, datetime.datetime):
+                value = render_date_input(
+                    "New value", column_type, key=f"{db_name}_bulk_value_date"
+                )
+            else:
+                value = st.text_input("New value", key=f"{db_name}_bulk_value_text")
+        values = {column_name: value}
+
+    confirmed = True
+    if not filters:
+        confirmed = st.checkbox(
+            f"{operation} all records", key=f"{db_name}_bulk_confirm_all"
+        )
+    dry_run = st.checkbox(
+        "Dry run (count the changes, then roll them back)",
+        value=True,
+        key=f"{db_name}_bulk_dry_run",
+    )
+    if not st.button(
+        f"Run Bulk {operation}", key=f"{db_name}_bulk_run", disabled=not confirmed
+    ):
         return
 
-    with open(schema_file, "r") as f:
-        schema_json = f.read()
-    schema_df = pd.read_json(StringIO(schema_json))
+    conditions = compile_filters(model_class, filters)
+    try:
+        if operation == "Delete":
+            affected = bulk_delete(engine, model_class, conditions, dry_run)
+        else:
+            affected = bulk_update(engine, model_class, conditions, values, dry_run)
+    except Exception as e:
+        st.error(f"Error running bulk {operation.lower()}: {e}")
+        return
+
+    verb = "deleted" if operation == "Delete" else "updated"
+    if dry_run:
+        st.info(f"Dry run: {affected} records would be {verb}. Nothing was changed.")
+        return
+    mark_data_changed(engine, model_class, db_name)
+    reset_page_state(get_page_state(db_name))
+    st.session_state[summary_key] = f"{affected} records {verb}."
+    st.rerun()
 
-    with open(pk_file, "r") as f:
-        primary_keys = json.load(f)
 
-    if os.path.exists(desc_file):
-        with open(desc_file, "r") as f:
-            description = f.read()
+def render_grid_editor(db_name, engine, model_class, key_names, page, editor_key):
+    """
+    Shows a page of records in an editable grid. Rows can be edited, added
+    and deleted; saving writes only the differences, in one transaction.
+    """
+    summary_key = f"{db_name}_grid_summary"
+    if summary_key in st.session_state:
+        summary = st.session_state.pop(summary_key)
+        st.success(
+            f"Saved: {summary['updated']} updated, {summary['inserted']} added, "
+            f"{summary['deleted']} deleted."
+        )
+
+    st.data_editor(to_dataframe(page), num_rows="dynamic", key=editor_key)
+
+    changes = st.session_state.get(editor_key, {})
+    pending = (
+        len(changes.get("edited_rows", {}))
+        + len(changes.get("added_rows", []))
+        + len(changes.get("deleted_rows", []))
+    )
+    col_save, col_discard = st.columns(2)
+    with col_save:
+        save = st.button(
+            f"Save Changes ({pending})",
+            key=f"{db_name}_grid_save",
+            disabled=not pending,
+        )
+    with col_discard:
+        discard = st.button(
+            "Discard Changes", key=f"{db_name}_grid_discard", disabled=not pending
+        )
+
+    if save:
+        try:
+            summary = apply_grid_changes(
+                engine, model_class, key_names, page.to_pylist(), changes
+            )
+        except Exception as e:
+            st.error(f"Error saving changes: {e}")
+            return
+        mark_data_changed(engine, model_class, db_name)
+        st.session_state[summary_key] = summary
+        del st.session_state[editor_key]
+        st.rerun()
+    elif discard:
+        del st.session_state[editor_key]
+        st.rerun()
+
+
+def render_record_browser(
+    db_name, engine, model_class, key_names, row_count, filters=(), sort=None
+):
+    """
+    Shows one page of records using keyset pagination on the primary key,
+    or on the sort column followed by the primary key. Only the visible
+    page is read from the database and sent to the frontend.
+
+    Args:
+        db_name: Name of the database.
+        engine: The database engine.
+        model_class: The SQLModel table class.
+        key_names: Column names of the primary key, in order.
+        row_count: Number of matching records, used for the page count.
+        filters: Filters of the records, see ``tools.db_filters``.
+        sort: Optional tuple of (column name, descending).
+
+    Returns:
+        The records of the visible page as a pyarrow.Table.
+    """
+    page_state = get_page_state(db_name)
+    page_size_key = f"{db_name}_page_size"
+    if page_size_key not in st.session_state:
+        st.session_state[page_size_key] = page_state["page_size"]
+    page_state["page_size"] = st.session_state[page_size_key]
+
+    page, has_next = load_page(
+        db_name,
+        engine,
+        model_class,
+        key_names,
+        page_state["page_size"],
+        page_state["after_key"],
+        filters,
+        sort,
+    )
+    if not page.num_rows and page_state["page"] > 1:
+        # The page emptied out, e.g. after deleting its last records
+        reset_page_state(page_state)
+        page, has_next = load_page(
+            db_name,
+            engine,
+            model_class,
+            key_names,
+            page_state["page_size"],
+            filters=filters,
+            sort=sort,
+        )
+
+    grid_edit = st.toggle("Edit in grid", key=f"{db_name}_grid_edit")
+    if grid_edit:
+        # The editor state belongs to the page it was made on
+        page_identity = (
+            page_state["page_size"],
+            tuple(page_state["after_key"] or ()),
+            filters,
+            sort,
+        )
+        editor_key = f"{db_name}_grid_{hash(page_identity)}"
+        render_grid_editor(db_name, engine, model_class, key_names, page, editor_key)
     else:
-        description = "No description provided."
+        st.dataframe(to_dataframe(page))
+
+    # Only the first and last records are needed as Python values
+    first_key = last_key = None
+    if page.num_rows:
+        first_row, last_row = page.take([0, page.num_rows - 1]).to_pylist()
+        first_key = row_key(first_row, key_names, sort)
+        last_key = row_key(last_row, key_names, sort)
+
+    col_prev, col_page, col_next, col_size, col_jump = st.columns(5)
+    with col_prev:
+        st.button(
+            "Previous",
+            key=f"{db_name}_previous_page",
+            disabled=page_state["page"] <= 1 or first_key is None,
+            on_click=go_to_previous_page,
+            args=(page_state, engine, model_class, key_names, first_key, filters, sort),
+        )
+    with col_page:
+        page_count = max(math.ceil(row_count / page_state["page_size"]), 1)
+        st.write(f"Page {page_state['page']} of {page_count}")
+    with col_next:
+        st.button(
+            "Next",
+            key=f"{db_name}_next_page",
+            disabled=not has_next,
+            on_click=go_to_next_page,
+            args=(page_state, last_key),
+        )
+    with col_size:
+        st.selectbox(
+            "Records per page",
+            options=PAGE_SIZE_OPTIONS,
+            key=page_size_key,
+            on_change=reset_page_state,
+            args=(page_state,),
+        )
+    with col_jump:
+        jump_key = f"{db_name}_page_jump"
+        st.number_input(
+            "Jump to page", min_value=1, max_value=page_count, step=1, key=jump_key
+        )
+        st.button(
+            "Go",
+            key=f"{db_name}_page_jump_go",
+            on_click=jump_to_page,
+            args=(page_state, engine, model_class, key_names, jump_key, filters, sort),
+        )
+    if "page_jump_error" in st.session_state:
+        st.warning(st.session_state.pop("page_jump_error"))
 
-    # Import the model class from the model file
-    models_dir = "models"
-    model_file = os.path.join(models_dir, f"{db_name}.py")
-    model_name = f"{db_name}_model"
-    if model_name in st.session_state["imported_db_classes"]:
-        print(model_name, "found in session state.")
-        model_class = st.session_state["imported_db_classes"][model_name]
-        engine = get_db_engine(db_name)
+    return page
+
+
+def get_date_type(field_type):
+    """
+    Returns datetime.date or datetime.datetime for a date field type, or
+    None for any other type.
+    """
+    for date_type in (datetime.datetime, datetime.date):
+        if field_type == Optional[date_type] or field_type == date_type:
+            return date_type
+    return None
+
+
+def render_date_input(label, date_type, value=None, key=None):
+    """
+    Renders a date input, with a time input next to it for datetimes.
+
+    Returns:
+        A date or datetime, or None while the date is empty.
+    """
+    if date_type is not datetime.datetime:
+        return st.date_input(
+            label, value=value, min_value=datetime.date(1900, 1, 1), key=key
+        )
+    col_date, col_time = st.columns(2)
+    with col_date:
+        day = st.date_input(
+            label,
+            value=value.date() if value is not None else None,
+            min_value=datetime.date(1900, 1, 1),
+            key=key,
+        )
+    with col_time:
+        time = st.time_input(
+            f"{label} time",
+            value=value.time() if value is not None else datetime.time(),
+            key=f"{key}_time" if key is not None else None,
+        )
+    return datetime.datetime.combine(day, time) if day is not None else None
+
+
+def set_lookup_page(after_key_name, after_key):
+    if after_key is None:
+        st.session_state.pop(after_key_name, None)
+    else:
+        st.session_state[after_key_name] = after_key
+
+
+def format_key(key_names, key):
+    return ", ".join(f"{name}={value}" for name, value in zip(key_names, key))
+
+
+def render_record_lookup(db_name, engine, model_class, key_names, action):
+    """
+    Finds a record by its primary key without sending every key to the
+    frontend. The typed key values select the matching keys in key order,
+    at most LOOKUP_LIMIT at a time, see ``find_keys``.
+
+    Args:
+        db_name: Name of the database.
+        engine: The database engine.
+        model_class: The SQLModel table class.
+        key_names: Column names of the primary key, in order.
+        action: What the record is looked up for, used in labels and keys.
+
+    Returns:
+        The key of the selected record as a tuple, or None.
+    """
+    widget_prefix = f"{db_name}_{action}_lookup"
+    after_key_name = f"{widget_prefix}_after"
+    table = model_class.__table__
+
+    start_values = []
+    for column, key_name in zip(st.columns(len(key_names)), key_names):
+        key_type = table.c[key_name].type.python_type
+        with column:
+            if key_type in (datetime.date, datetime.datetime):
+                value = st.date_input(
+                    f"{key_name} from",
+                    value=None,
+                    min_value=datetime.date(1900, 1, 1),
+                    key=f"{widget_prefix}_{key_name}",
+                    on_change=set_lookup_page,
+                    args=(after_key_name, None),
+                )
+                if value is not None and key_type is datetime.datetime:
+                    value = datetime.datetime.combine(value, datetime.time())
+            elif key_type in (int, float):
+                value = st.number_input(
+                    f"{key_name} from",
+                    value=None,
+                    step=1 if key_type is int else None,
+                    key=f"{widget_prefix}_{key_name}",
+                    on_change=set_lookup_page,
+                    args=(after_key_name, None),
+                )
+            else:
+                value = st.text_input(
+                    f"{key_name} starts with",
+                    key=f"{widget_prefix}_{key_name}",
+                    on_change=set_lookup_page,
+                    args=(after_key_name, None),
+                )
+                value = value or None
+        start_values.append(value)
+
+    after_key = st.session_state.get(after_key_name)
+    keys, has_more = cached_query(
+        db_name,
+        (
+            "lookup",
+            tuple(key_names),
+            tuple(start_values),
+            tuple(after_key) if after_key is not None else None,
+            LOOKUP_LIMIT,
+        ),
+        lambda: find_keys(
+            engine, model_class, key_names, start_values, LOOKUP_LIMIT, after_key
+        ),
+    )
+    if not keys:
+        st.write("No matching records.")
+        return None
+
+    selected_key = st.selectbox(
+        f"Record to {action}",
+        options=keys,
+        format_func=lambda key: format_key(key_names, key),
+        key=f"{widget_prefix}_select",
+    )
+    col_first, col_more = st.columns(2)
+    with col_first:
+        st.button(
+            "First matches",
+            key=f"{widget_prefix}_first",
+            disabled=after_key is None,
+            on_click=set_lookup_page,
+            args=(after_key_name, None),
+        )
+    with col_more:
+        st.button(
+            "More matches",
+            key=f"{widget_prefix}_more",
+            disabled=not has_more,
+            on_click=set_lookup_page,
+            args=(after_key_name, list(keys[-1])),
+        )
+    return selected_key
+
+
+def render_column_stats(db_name, engine, model_class):
+    """
+    Shows per-column statistics and a GROUP BY breakdown computed with SQL
+    aggregates. Results are cached per column for the current data version,
+    so after a write only the columns shown are computed again, in one scan.
+    """
+    if not st.toggle("Compute column statistics", key=f"{db_name}_column_stats"):
+        st.write("Statistics scan the whole table, so they are computed on demand.")
+        return
+
+    column_names = [column.name for column in model_class.__table__.columns]
+    selected = st.multiselect(
+        "Columns",
+        options=column_names,
+        default=column_names,
+        key=f"{db_name}_column_stats_columns",
+    )
+    if selected:
+        profiles = cached_queries(
+            db_name,
+            [("column_stats", column_name) for column_name in selected],
+            lambda query_keys: {
+                ("column_stats", column_name): profile
+                for column_name, profile in profile_columns(
+                    engine, model_class, [query_key[1] for query_key in query_keys]
+                ).items()
+            },
+        )
+        rows = []
+        for column_name in selected:
+            profile = profiles[("column_stats", column_name)]
+            # Min and max hold values of every column type, shown as text
+            rows.append(
+                {
+                    "column": column_name,
+                    **profile,
+                    "min": None if profile["min"] is None else str(profile["min"]),
+                    "max": None if profile["max"] is None else str(profile["max"]),
+                }
+            )
+        st.dataframe(pd.DataFrame(rows), hide_index=True)
+
+    col_group, col_value = st.columns(2)
+    with col_group:
+        group_name = st.selectbox(
+            "Group by",
+            options=[None] + column_names,
+            format_func=lambda option: option or "(none)",
+            key=f"{db_name}_group_by",
+        )
+    with col_value:
+        value_name = st.selectbox(
+            "Summarize",
+            options=[None]
+            + [
+                column.name
+                for column in model_class.__table__.columns
+                if is_numeric(column)
+            ],
+            format_func=lambda option: option or "(count only)",
+            key=f"{db_name}_group_value",
+        )
+    if group_name is not None:
+        groups, group_count = cached_query(
+            db_name,
+            ("group_by", group_name, value_name, GROUP_LIMIT),
+            lambda: group_by_column(engine, model_class, group_name, value_name),
+        )
+        if group_count > groups.num_rows:
+            st.write(f"The {groups.num_rows} largest of {group_count} groups:")
+        st.dataframe(to_dataframe(groups), hide_index=True)
+
+
+def render_indexes(db_name, engine, model_class):
+    """
+    Lists the indexes of a table and adds or drops them in place, without
+    rebuilding the database.
+    """
+    table_name = model_class.__tablename__
+    indexes = list_indexes(engine, table_name)
+    if indexes:
+        st.dataframe(
+            pd.DataFrame(
+                [
+                    {
+                        "name": index["name"],
+                        "columns": ", ".join(index["columns"]),
+                        "unique": index["unique"],
+                        "origin": index["origin"],
+                    }
+                    for index in indexes
+                ]
+            ),
+            hide_index=True,
+        )
+    else:
+        st.write("Only the primary key is indexed.")
+
+    with st.form(f"{db_name}_add_index"):
+        columns = st.multiselect(
+            "Columns (in index order)",
+            options=[column.name for column in model_class.__table__.columns],
+        )
+        unique = st.checkbox("Unique")
+        index_name = st.text_input("Index name (optional)")
+        if st.form_submit_button("Add Index", disabled=has_active_jobs(db_name)):
+            if not columns:
+                st.error("Select at least one column.")
+            else:
+                index_name = sanitize_field_name(index_name) if index_name else None
+                index_name = index_name or get_index_name(table_name, columns, unique)
+                # SQLite builds the index from every row, which takes a while
+                # on a large table
+                submit_job(
+                    db_name,
+                    "index",
+                    f"Build index {index_name}",
+                    lambda report: create_index(
+                        engine, table_name, index_name, columns, unique
+                    ),
+                )
+                st.rerun()
+
+    droppable = [index["name"] for index in indexes if index["droppable"]]
+    if droppable:
+        drop_name = st.selectbox(
+            "Index to drop", options=droppable, key=f"{db_name}_drop_index"
+        )
+        if st.button("Drop Index", key=f"{db_name}_drop_index_button"):
+            try:
+                drop_index(engine, drop_name)
+                st.rerun()
+            except Exception as e:
+                st.error(f"Error dropping index: {e}")
+
+
+def render_maintenance(db_name, engine, model_class):
+    """
+    Shows the size of the database file and runs a VACUUM as a background
+    job.
+    """
+    st.write(
+        f"**File size**: {os.path.getsize(get_db_file(db_name)) / 1024 / 1024:.1f} MB"
+    )
+    if st.button(
+        "Vacuum Database",
+        key=f"{db_name}_vacuum",
+        disabled=has_active_jobs(db_name),
+    ):
+
+        def run_vacuum(report):
+            try:
+                summary = vacuum_database(engine)
+                # VACUUM may renumber the rowids the full-text index refers to
+                if get_search_columns(model_class):
+                    rebuild_search_index(engine, model_class)
+            finally:
+                mark_data_changed(engine, model_class, db_name)
+            return summary
+
+        submit_job(db_name, "vacuum", "Vacuum database", run_vacuum)
+        st.rerun()
+
+
+def render_jobs(db_name):
+    """
+    Lists the background jobs of a database. While one is queued or running
+    the list is a fragment polling their status every JOB_POLL_SECONDS,
+    without rerunning the page. The page reruns once they have all ended so
+    that it shows their results.
+    """
+    active = has_active_jobs(db_name)
+    job_list = st.fragment(
+        render_job_list, run_every=JOB_POLL_SECONDS if active else None
+    )
+    job_list(db_name, active)
+
+
+def render_job_list(db_name, was_active):
+    jobs = list_jobs(db_name)
+    active_jobs = [job for job in jobs if job["status"] in ACTIVE_JOB_STATUSES]
+    if was_active and not active_jobs:
+        st.rerun()
+    if not jobs:
+        st.write("No background jobs yet.")
+        return
+    for job in active_jobs:
+        st.progress(
+            job["progress"] or 0.0,
+            text=f"{job['label']}: {job['message'] or job['status']}",
+        )
+    st.dataframe(
+        pd.DataFrame(
+            [
+                {
+                    "job": job["id"],
+                    "task": job["label"],
+                    "status": job["status"],
+                    "progress": job["progress"],
+                    "seconds": job["seconds"],
+                    "error": job["error"],
+                    "created_at": job["created_at"],
+                }
+                for job in jobs
+            ]
+        ),
+        hide_index=True,
+    )
+
+
+def render_change_watcher(db_name, engine, model_class, data_version):
+    """
+    Reruns the page when the data of a database changes after it was
+    rendered at ``data_version``, e.g. because another session added a
+    record. The check is a fragment running every CHANGE_POLL_SECONDS and
+    reads a single counter, so the records are only read again when they
+    actually changed.
+    """
+    if not st.toggle(
+        "Refresh when the data changes",
+        value=True,
+        key=f"{db_name}_watch_changes",
+        help="Checks every few seconds whether other sessions or processes "
+        "changed the records, and shows the changes.",
+    ):
+        return
+
+    change_check = st.fragment(render_change_check, run_every=CHANGE_POLL_SECONDS)
+    change_check(db_name, engine, model_class, data_version)
+
+
+def render_change_check(db_name, engine, model_class, data_version):
+    version = check_for_changes(
+        engine, model_class, db_name, max_age=CHANGE_CHECK_INTERVAL
+    )
+    if version != data_version:
+        st.rerun()
+
+
+def render_analytics(db_name):
+    """
+    Runs read-only SQL over Parquet snapshots of the tables with DuckDB,
+    vectorized and multi-threaded, without reading the SQLite files the
+    CRUD operations use. Stale snapshots are refreshed before the query.
+    """
+    if not is_analytics_available():
+        st.info("Install the duckdb package to run analytic queries here.")
+        return
+    selected = st.multiselect(
+        "Databases",
+        options=list_databases(),
+        default=[db_name],
+        key=f"{db_name}_analytics_databases",
+        help="Each database is a view named after it, so they can be joined.",
+    )
+    sql = st.text_area(
+        "SQL (DuckDB dialect)",
+        value=f'SELECT COUNT(*) AS records FROM "{db_name}"',
+        key=f"{db_name}_analytics_sql",
+    )
+    if not st.button("Run Query", key=f"{db_name}_analytics_run"):
+        return
+
+    try:
+        snapshots = {}
+        with st.spinner("Refreshing snapshots..."):
+            for name in selected:
+                catalog_entry = get_database(name)
+                info, refresh = refresh_snapshot(
+                    get_db_engine(name),
+                    load_model_class(catalog_entry),
+                    name,
+                    catalog_entry["modified_at"],
+                )
+                snapshots[name] = get_snapshot_files(name, info)
+                if refresh != "current":
+                    st.caption(f"Snapshot of {name}: {refresh} refresh.")
+        result = run_analytic_query(snapshots, sql)
+    except Exception as e:
+        st.error(f"Error running query: {e}")
+        return
+
+    st.write(f"{result['table'].num_rows:,} rows in {result['seconds'] * 1000:.1f} ms")
+    if result["truncated"]:
+        st.write(f"Only the first {ANALYTICS_ROW_LIMIT:,} rows are shown.")
+    st.dataframe(to_dataframe(result["table"]), hide_index=True)
+
+
+def render_migration_plan(db_name, catalog_entry, schema_df, primary_keys):
+    """
+    Shows how generating an existing database again migrates its table to
+    the new schema, keeping the data. Columns that are no longer in the
+    schema can be renamed to one of the new columns instead of dropped.
+
+    Returns:
+        A dict with the new table and the migration plan, see
+        ``tools.db_migrate.plan_migration``.
+    """
+    engine = get_db_engine(db_name)
+    old_model = load_model_class(catalog_entry)
+    table_name = old_model.__tablename__
+    model_name = catalog_entry["table_name"]
+    new_table = build_model_class(
+        create_pydantic_model(schema_df, model_name), model_name, primary_keys
+    ).__table__
+    old_index_names = [index.name for index in old_model.__table__.indexes]
+
+    st.info(
+        f"The database {db_name} already exists. Generating it again migrates "
+        "its table to this schema and keeps the data."
+    )
+    if has_table_copy(engine, table_name):
+        st.warning(
+            "A migration of this table was interrupted. Migrating to the same "
+            "schema continues where it stopped."
+        )
+        if st.button("Discard Interrupted Migration", key=f"{db_name}_cancel_copy"):
+            cancel_table_copy(engine, table_name)
+            st.rerun()
+
+    plan = plan_migration(engine, table_name, new_table, {}, old_index_names)
+    renames = {}
+    if plan["drops"] and plan["adds"]:
+        st.write("Columns no longer in the schema can be renamed instead:")
+        for column in plan["drops"]:
+            target = st.selectbox(
+                f"Rename {column} to",
+                options=["(drop)"] + plan["adds"],
+                key=f"{db_name}_rename_{column}",
+            )
+            if target != "(drop)":
+                renames[target] = column
+        plan = plan_migration(engine, table_name, new_table, renames, old_index_names)
+
+    changes = [f"rename {old} to {new}" for old, new in plan["renames"].items()]
+    changes += [f"add {column}" for column in plan["adds"]]
+    changes += [f"drop {column}" for column in plan["drops"]]
+    changes += [f"drop index {name}" for name in plan["drop_indexes"]]
+    changes += [f"create index {name}" for name, _, _ in plan["create_indexes"]]
+    if not changes and not plan["rebuild_reasons"]:
+        st.write("**Migration**: the table already matches the schema.")
     else:
-        print(model_name, "not found in session state. Importing from file.")
-        model_class = import_model_class(model_file, model_name)
-        engine = get_db_engine(db_name)
-    # Create engine
+        st.write(f"**Migration**: {', '.join(changes + plan['rebuild_reasons'])}")
+    if plan["rebuild_reasons"]:
+        if plan["online"]:
+            st.write("The table is copied in batches and stays usable during the copy.")
+        else:
+            st.write(
+                "The new primary key renumbers the rows, so the table is copied in "
+                "one transaction. Writes wait until it is done."
+            )
+    unconvertible = cached_query(
+        db_name,
+        (
+            "unconvertible",
+            tuple(sorted(plan["conversions"].items())),
+            tuple(sorted(plan["renames"].items())),
+        ),
+        lambda: count_unconvertible_values(engine, table_name, plan),
+    )
+    for column, count in unconvertible.items():
+        if count:
+            st.warning(
+                f"{count} values of {column} cannot be converted to "
+                f"{plan['conversions'][column]} and will be emptied."
+            )
+    return {"new_table": new_table, "plan": plan}
+
+
+def render_date_migration(db_name, engine, model_class, schema_df):
+    """
+    Offers to convert the date columns of a table created before the native
+    date types, which still hold their dates as text.
+    """
+    text_columns = model_class.__table__.info.get("text_date_columns", [])
+    column_types = {
+        column: data_type
+        for _, column, data_type in get_schema_columns(schema_df)
+        if column in text_columns
+    }
+    st.warning(
+        f"Dates in {', '.join(text_columns)} are stored as text, so they sort "
+        "and filter as strings. Convert them to native dates to fix this."
+    )
+    unreadable = cached_query(
+        db_name,
+        ("unreadable_dates", tuple(text_columns)),
+        lambda: count_unreadable_dates(engine, model_class.__tablename__, text_columns),
+    )
+    for column, count in unreadable.items():
+        if count:
+            st.write(
+                f"**{column}**: {count} values are not readable as dates and "
+                "will be emptied"
+            )
+    if st.button("Convert to Native Dates", key=f"{db_name}_migrate_dates"):
+        try:
+            with st.spinner("Rebuilding the table..."):
+                migrate_text_dates(engine, model_class.__table__, column_types)
+        except Exception as e:
+            st.error(f"Error converting dates: {e}")
+            return
+        # The model is built again with native date columns
+        forget_model(model_class.__name__)
+        bump_data_version(db_name)
+        st.rerun()
+
+
+def interact_with_database(db_name):
+    st.header(f"Interact with Database: {normalize_db_name(db_name)}")
+
+    # Load the schema, primary keys and description from the catalog
+    catalog_entry = get_database(db_name)
+    if catalog_entry is None:
+        st.error("Database not found in the catalog.")
+        return
+
+    # The schema may have been migrated since this session last showed it,
+    # by a job of this session or of another one
+    schema_key = f"{db_name}_schema"
+    schema = (catalog_entry["schema_json"], tuple(catalog_entry["primary_keys"]))
+    if st.session_state.get(schema_key, schema) != schema:
+        reset_record_views(db_name)
+        # A toast, since the run that finds the change is often followed by
+        # a rerun, e.g. when the migration job ends
+        st.toast(
+            "The schema of this database changed, so the filters, sort order "
+            "and unsaved grid edits were cleared.",
+            icon="⚠️",
+        )
+    st.session_state[schema_key] = schema
+
+    schema_df = pd.read_json(StringIO(catalog_entry["schema_json"]))
+    primary_keys = catalog_entry["primary_keys"]
+    description = catalog_entry["description"] or "No description provided."
+
+    # Build the model class from the schema
+    model_class = load_model_class(catalog_entry)
+    engine = get_db_engine(db_name)
 
     # Database Details
     st.subheader("Database Details")
     st.write(f"**Name**: {normalize_db_name(db_name)}")
     st.write(f"**Description**: {description}")
 
-    # Number of records, etc.
-    with Session(engine) as session:
-        statement = select(model_class)
-        results = session.exec(statement)
-        records = results.all()
-        record_count = len(records)
-        st.write(f"**Number of records**: {record_count}")
+    # Cached results are dropped first if another process changed the table
+    data_version = check_for_changes(engine, model_class, db_name)
+    render_change_watcher(db_name, engine, model_class, data_version)
+
+    # Number of records, etc. are read from the stats table kept by triggers
+    table_stats = cached_query(
+        db_name, ("stats",), lambda: get_table_stats(engine, model_class)
+    )
+    st.write(f"**Number of records**: {table_stats['row_count']}")
+    st.write(f"**Last modified**: {table_stats['last_modified'] or 'Never'}")
+    if table_stats["row_count"]:
+        st.write(
+            f"**Primary key range**: {table_stats['min_pk']} to {table_stats['max_pk']}"
+        )
+    if st.button("Recount Records", key=f"{db_name}_recount"):
+        refresh_table_stats(engine, model_class)
+        mark_data_changed(engine, model_class, db_name)
+        st.rerun()
+    if model_class.__table__.info.get("text_date_columns"):
+        render_date_migration(db_name, engine, model_class, schema_df)
+    with st.expander("Background Jobs", expanded=has_active_jobs(db_name)):
+        render_jobs(db_name)
+    with st.expander("Connection Pool"):
+        pool_stats = get_pool_stats(get_db_file(db_name))
+        if pool_stats:
+            st.write(
+                f"**Checked out**: {pool_stats['checked_out']} of "
+                f"{pool_stats['pool_size']} pooled connections"
+            )
+            st.write(f"**Checkouts**: {pool_stats['checkouts']}")
+            st.write(f"**Connections opened**: {pool_stats['connects']}")
+            st.write(
+                f"**Checkout wait**: {pool_stats['average_wait_ms']:.2f} ms average, "
+                f"{pool_stats['max_wait_ms']:.2f} ms max"
+            )
+            st.write(f"**Checkout timeouts**: {pool_stats['timeouts']}")
+            st.write(f"**Engines in this process**: {pool_stats['engines_in_process']}")
+        group_commit = st.toggle(
+            "Group commit",
+            value=is_group_commit_enabled(engine),
+            key=f"{db_name}_group_commit",
+            help="Records added or updated by all sessions within "
+            f"{GROUP_COMMIT_WINDOW * 1000:.0f} ms of each other are committed "
+            "together by one writer thread.",
+        )
+        if group_commit != is_group_commit_enabled(engine):
+            set_group_commit(engine, group_commit)
+        writer_stats = get_writer_stats(engine)
+        if writer_stats:
+            st.write(
+                f"**Group commits**: {writer_stats['writes']} writes in "
+                f"{writer_stats['commits']} commits "
+                f"({writer_stats['writes_per_commit']:.1f} per commit, "
+                f"{writer_stats['largest_commit']} at most)"
+            )
+            st.write(
+                f"**Queued writes**: {writer_stats['queued']}, "
+                f"**Failed writes**: {writer_stats['failed']}"
+            )
+    with st.expander("Model Registry"):
+        st.dataframe(pd.DataFrame(get_model_build_stats()))
+        model_code = generate_model_code(
+            create_pydantic_model(schema_df, catalog_entry["table_name"]),
+            catalog_entry["table_name"],
+            primary_keys,
+        )
+        st.download_button(
+            "Download Model File",
+            data=model_code,
+            file_name=f"{db_name}.py",
+            mime="text/x-python",
+            key=f"{db_name}_download_model",
+        )
+    with st.expander("Column Statistics"):
+        render_column_stats(db_name, engine, model_class)
+    with st.expander("Indexes"):
+        render_indexes(db_name, engine, model_class)
+    with st.expander("Maintenance"):
+        render_maintenance(db_name, engine, model_class)
+    with st.expander("Analytics"):
+        render_analytics(db_name)
+    with st.expander("Query Cache"):
+        cache_stats = get_query_cache_stats()
+        st.write(
+            f"**Memory**: {cache_stats['bytes'] / 1024 / 1024:.1f} MB of "
+            f"{cache_stats['max_bytes'] / 1024 / 1024:.0f} MB "
+            f"in {cache_stats['entries']} results"
+        )
+        st.write(
+            f"**Hits**: {cache_stats['hits']}, **Misses**: {cache_stats['misses']}, "
+            f"**Evictions**: {cache_stats['evictions']}"
+        )
 
     # CRUD Forms
     st.subheader("CRUD Operations")
@@ -400,6 +2066,10 @@ def interact_with_database(db_name):
                 form_fields[field_name] = st.number_input(field_name, step=1)
             elif field_type == Optional[float] or field_type == float:
                 form_fields[field_name] = st.number_input(field_name)
+            elif get_date_type(field_type) is not None:
+                form_fields[field_name] = render_date_input(
+                    field_name, get_date_type(field_type)
+                )
             else:
                 form_fields[field_name] = st.text_input(field_name)
         if st.form_submit_button("Add Record"):
@@ -413,39 +2083,75 @@ def interact_with_database(db_name):
                         new_record_data[field_name] = float(field_value)
                     else:
                         new_record_data[field_name] = field_value
-                new_record = model_class(**new_record_data)
-                with Session(engine) as session:
-                    session.add(new_record)
-                    session.commit()
-                    st.success("Record added successfully!")
-                    st.rerun()
+
+                def add_record():
+                    with Session(engine) as session:
+                        session.add(model_class(**new_record_data))
+                        session.commit()
+
+                if is_group_commit_enabled(engine):
+                    run_grouped_write(
+                        engine,
+                        lambda connection: connection.execute(
+                            model_class.__table__.insert(), new_record_data
+                        ).rowcount,
+                    )
+                else:
+                    run_with_retry(add_record)
+                mark_data_changed(engine, model_class, db_name)
+                st.success("Record added successfully!")
+                st.rerun()
             except Exception as e:
                 st.error(f"Error adding record: {e}")
 
+    # Bulk import
+    st.write("### Bulk Import")
+    key_names = [sanitize_field_name(key) for key in primary_keys]
+    render_bulk_import(db_name, engine, model_class, schema_df, key_names)
+
     # Read
+    if get_search_columns(model_class):
+        st.write("### Search Records")
+        render_search(db_name, engine, model_class)
+
     st.write("### View Records")
-    with Session(engine) as session:
-        statement = select(model_class)
-        results = session.exec(statement)
-        records = results.all()
-        df = pd.DataFrame([record.dict() for record in records])
-        st.dataframe(df)
+    filters, sort = render_record_filters(db_name, schema_df)
+    row_count = table_stats["row_count"]
+    if filters:
+        row_count = cached_query(
+            db_name,
+            ("count", filters),
+            lambda: count_rows(
+                engine, model_class, compile_filters(model_class, filters)
+            ),
+        )
+        st.write(f"**Matching records**: {row_count}")
+    render_record_browser(
+        db_name, engine, model_class, key_names, row_count, filters, sort
+    )
+
+    # Export
+    st.write("### Export Records")
+    render_export(db_name, engine, model_class, key_names, table_stats["row_count"])
 
     # Update
     st.write("### Update Record")
-    if not records:
+    if not table_stats["row_count"]:
         st.write("No records to update.")
     else:
-        primary_key_field = primary_keys[0]
-        record_ids = [getattr(record, primary_key_field) for record in records]
-        selected_id = st.selectbox("Select Record ID to Update:", options=record_ids)
-        if selected_id:
+        selected_key = render_record_lookup(
+            db_name, engine, model_class, key_names, "update"
+        )
+        if selected_key is not None:
             with Session(engine) as session:
-                record = session.get(model_class, selected_id)
+                record = session.get(model_class, dict(zip(key_names, selected_key)))
+            if record is None:
+                st.write("The record no longer exists.")
+            else:
                 with st.form("update_form"):
                     update_fields = {}
                     for field_name, field_value in record.dict().items():
-                        if field_name in primary_keys:
+                        if field_name in key_names:
                             update_fields[field_name] = st.text_input(
                                 field_name, value=str(field_value), disabled=True
                             )
@@ -453,30 +2159,74 @@ def interact_with_database(db_name):
                             field_type = model_class.__annotations__[field_name]
                             if field_type == Optional[int] or field_type == int:
                                 update_fields[field_name] = st.number_input(
-                                    field_name, value=int(field_value), step=1
+                                    field_name, value=field_value, step=1
                                 )
                             elif field_type == Optional[float] or field_type == float:
                                 update_fields[field_name] = st.number_input(
-                                    field_name, value=float(field_value)
+                                    field_name, value=field_value
+                                )
+                            elif get_date_type(field_type) is not None:
+                                update_fields[field_name] = render_date_input(
+                                    field_name,
+                                    get_date_type(field_type),
+                                    value=field_value,
                                 )
                             else:
                                 update_fields[field_name] = st.text_input(
-                                    field_name, value=str(field_value)
+                                    field_name,
+                                    value="" if field_value is None else field_value,
                                 )
                     if st.form_submit_button("Update Record"):
                         try:
+                            updated_values = {}
                             for field_name, field_value in update_fields.items():
+                                if field_name in key_names:
+                                    continue
                                 field_type = model_class.__annotations__[field_name]
-                                if field_type == Optional[int] or field_type == int:
-                                    setattr(record, field_name, int(field_value))
+                                if field_value is None:
+                                    updated_values[field_name] = None
+                                elif field_type == Optional[int] or field_type == int:
+                                    updated_values[field_name] = int(field_value)
                                 elif (
                                     field_type == Optional[float] or field_type == float
                                 ):
-                                    setattr(record, field_name, float(field_value))
+                                    updated_values[field_name] = float(field_value)
                                 else:
-                                    setattr(record, field_name, field_value)
-                            session.add(record)
-                            session.commit()
+                                    updated_values[field_name] = field_value
+
+                            def update_record():
+                                with Session(engine) as write_session:
+                                    record = write_session.get(
+                                        model_class, dict(zip(key_names, selected_key))
+                                    )
+                                    for field_name, value in updated_values.items():
+                                        setattr(record, field_name, value)
+                                    write_session.add(record)
+                                    write_session.commit()
+
+                            if is_group_commit_enabled(engine):
+                                table = model_class.__table__
+                                statement = (
+                                    table.update()
+                                    .where(
+                                        *[
+                                            table.c[name] == value
+                                            for name, value in zip(
+                                                key_names, selected_key
+                                            )
+                                        ]
+                                    )
+                                    .values(updated_values)
+                                )
+                                run_grouped_write(
+                                    engine,
+                                    lambda connection: connection.execute(
+                                        statement
+                                    ).rowcount,
+                                )
+                            else:
+                                run_with_retry(update_record)
+                            mark_data_changed(engine, model_class, db_name)
                             st.success("Record updated successfully!")
                             st.rerun()
                         except Exception as e:
@@ -484,24 +2234,36 @@ def interact_with_database(db_name):
 
     # Delete
     st.write("### Delete Record")
-    if not records:
+    if not table_stats["row_count"]:
         st.write("No records to delete.")
     else:
-        delete_id = st.selectbox(
-            "Select Record ID to Delete:", options=record_ids, key="delete_select"
+        delete_key = render_record_lookup(
+            db_name, engine, model_class, key_names, "delete"
         )
-        if st.button("Delete Record"):
+        if st.button("Delete Record", disabled=delete_key is None):
             try:
-                with Session(engine) as session:
-                    record = session.get(model_class, delete_id)
-                    if record:
-                        session.delete(record)
-                        session.commit()
-                        st.success("Record deleted successfully!")
-                        st.rerun()
+
+                def delete_record():
+                    with Session(engine) as session:
+                        record = session.get(
+                            model_class, dict(zip(key_names, delete_key))
+                        )
+                        if record:
+                            session.delete(record)
+                            session.commit()
+                        return record is not None
+
+                if run_with_retry(delete_record):
+                    mark_data_changed(engine, model_class, db_name)
+                    st.success("Record deleted successfully!")
+                    st.rerun()
             except Exception as e:
                 st.error(f"Error deleting record: {e}")
 
+    # Bulk update and delete
+    st.write("### Bulk Update and Delete")
+    render_bulk_changes(db_name, engine, model_class, key_names, filters, row_count)
+
 
 def main():
     st.title("Dynamic Database Generator")
@@ -562,10 +2324,78 @@ def main():
             default=field_names[0] if field_names else None,
         )
 
-        if st.button("Generate Database"):
+        save_model_file = st.checkbox(
+            "Also save the model as a Python file",
+            help=f"Writes models/{db_name}.py. The app itself does not need it.",
+        )
+
+        migration = None
+        catalog_entry = get_database(db_name)
+        jobs_running = catalog_entry is not None and has_active_jobs(db_name)
+        if jobs_running:
+            # The table may be changing, so a plan made now could be wrong
+            st.info(
+                f"Jobs of the database {db_name} are running. It can be "
+                "generated again once they have ended, see Background Jobs."
+            )
+        elif catalog_entry is not None:
+            try:
+                migration = render_migration_plan(
+                    db_name, catalog_entry, edited_df, primary_keys
+                )
+            except Exception as e:
+                st.error(f"Error planning the migration: {e}")
+                st.stop()
+
+        if st.button("Generate Database", disabled=jobs_running):
+            if migration is not None:
+                new_table = migration["new_table"]
+                plan = migration["plan"]
+
+                def run_migration(report):
+                    engine = get_db_engine(db_name)
+                    try:
+                        try:
+                            migrate_table(
+                                engine,
+                                new_table,
+                                plan,
+                                progress=lambda fraction: report(
+                                    fraction, f"Copied {fraction:.0%} of the rows"
+                                ),
+                            )
+                        except Exception:
+                            # Build the old model again on the next run, which
+                            # also restores the search index and stats triggers
+                            forget_model(catalog_entry["table_name"])
+                            raise
+                        model_class = generate_database(
+                            db_name,
+                            edited_df,
+                            primary_keys,
+                            description,
+                            save_model_file=save_model_file,
+                        )
+                        if plan["reset_stats"]:
+                            refresh_table_stats(engine, model_class)
+                    finally:
+                        bump_data_version(db_name)
+
+                # Copying a large table takes a while, so the catalog is only
+                # updated by the job once the table matches the new schema
+                submit_job(
+                    db_name, "migration", "Migrate to the new schema", run_migration
+                )
+                st.rerun()
             with st.spinner("Generating database..."):
                 try:
-                    generate_database(db_name, edited_df, primary_keys, description)
+                    generate_database(
+                        db_name,
+                        edited_df,
+                        primary_keys,
+                        description,
+                        save_model_file=save_model_file,
+                    )
                     st.success("Database generated successfully!")
                     st.rerun()
                 except Exception as e:
@@ -573,87 +2403,101 @@ def main():
 
     # Database Selection Interface
     st.header("Step 4: Select a Database to Interact With")
-    db_dir = "databases"
-    if os.path.exists(db_dir):
-        db_files = [f for f in os.listdir(db_dir) if f.endswith(".db")]
-        db_names = [os.path.splitext(f)[0] for f in db_files]
-        if db_names:
-            selected_db = st.selectbox("Select a database:", options=db_names)
-
-            if selected_db:
-                # Provide options to delete or rename databases
-                st.write(
-                    f"Selected Database: {normalize_db_name(selected_db)} ({selected_db})"
-                )
-                if st.button("Delete Database"):
-                    confirm_delete = st.checkbox(
-                        "Are you sure you want to delete this database?"
-                    )
-                    if confirm_delete:
-                        os.remove(os.path.join(db_dir, f"{selected_db}.db"))
-                        # Also remove schema and model files
-                        schemas_dir = "schemas"
-                        models_dir = "models"
-                        schema_file = os.path.join(
-                            schemas_dir, f"{selected_db}_schema.json"
-                        )
-                        pk_file = os.path.join(schemas_dir, f"{selected_db}_pk.json")
-                        desc_file = os.path.join(schemas_dir, f"{selected_db}_desc.txt")
-                        model_file = os.path.join(models_dir, f"{selected_db}.py")
-                        if os.path.exists(schema_file):
-                            os.remove(schema_file)
-                        if os.path.exists(pk_file):
-                            os.remove(pk_file)
-                        if os.path.exists(desc_file):
-                            os.remove(desc_file)
+    db_names = list_databases()
+    if db_names:
+        selected_db = st.selectbox("Select a database:", options=db_names)
+
+        if selected_db:
+            # Provide options to delete or rename databases
+            st.write(
+                f"Selected Database: {normalize_db_name(selected_db)} ({selected_db})"
+            )
+            # The files of a database cannot be removed or moved under its jobs
+            jobs_running = has_active_jobs(selected_db)
+            confirm_delete = st.checkbox(
+                "Are you sure you want to delete this database?"
+            )
+            if st.button(
+                "Delete Database", disabled=not confirm_delete or jobs_running
+            ):
+
+                def delete_files():
+                    db_file = get_db_file(selected_db)
+                    stop_writer(db_file)
+                    dispose_engine(db_file)
+                    for suffix in DATABASE_FILE_SUFFIXES:
+                        if os.path.exists(db_file + suffix):
+                            os.remove(db_file + suffix)
+                    drop_snapshot(selected_db)
+                    # Also remove the exported model file
+                    model_file = os.path.join("models", f"{selected_db}.py")
+                    if os.path.exists(model_file):
+                        os.remove(model_file)
+
+                catalog_entry = get_database(selected_db)
+                try:
+                    delete_database(selected_db, action=delete_files)
+                except Exception as e:
+                    st.error(f"Error deleting database: {e}")
+                    st.stop()
+                # A database created later under this name must not be served
+                # the cached results of this one
+                bump_data_version(selected_db)
+                if catalog_entry is not None:
+                    forget_model(catalog_entry["table_name"])
+                st.success(f"Database {selected_db} deleted.")
+                st.rerun()
+            rename_db = st.text_input(
+                "Enter new database name:", value=normalize_db_name(selected_db)
+            )
+            if st.button("Rename Database", disabled=jobs_running):
+                if (
+                    rename_db
+                    and rename_db != selected_db
+                    and rename_db != sanitize_field_name(selected_db) + "_db"
+                ):
+                    clean_rename_db = sanitize_field_name(rename_db)
+                    if get_database(clean_rename_db) is not None:
+                        st.error(f"Database {clean_rename_db} already exists.")
+                        st.stop()
+                    new_db_file = get_db_file(clean_rename_db)
+
+                    def rename_files():
+                        db_file = get_db_file(selected_db)
+                        stop_writer(db_file)
+                        dispose_engine(db_file)
+                        for suffix in DATABASE_FILE_SUFFIXES:
+                            if os.path.exists(db_file + suffix):
+                                os.rename(db_file + suffix, new_db_file + suffix)
+                        # The snapshot views are named after the database
+                        drop_snapshot(selected_db)
+                        # Also rename the exported model file
+                        model_file = os.path.join("models", f"{selected_db}.py")
                         if os.path.exists(model_file):
-                            os.remove(model_file)
-                        st.success(f"Database {selected_db} deleted.")
-                        st.rerun()
-                rename_db = st.text_input(
-                    "Enter new database name:", value=normalize_db_name(selected_db)
-                )
-                if st.button("Rename Database"):
-                    if (
-                        rename_db
-                        and rename_db != selected_db
-                        and rename_db != sanitize_field_name(selected_db) + "_db"
-                    ):
-                        clean_rename_db = sanitize_field_name(rename_db)
-                        os.rename(
-                            os.path.join(db_dir, f"{selected_db}.db"),
-                            os.path.join(
-                                db_dir, f"{sanitize_field_name(clean_rename_db)}.db"
-                            ),
-                        )
-                        # Also rename schema and model files
-                        schemas_dir = "schemas"
-                        models_dir = "models"
-                        os.rename(
-                            os.path.join(schemas_dir, f"{selected_db}_schema.json"),
-                            os.path.join(schemas_dir, f"{clean_rename_db}_schema.json"),
-                        )
-                        os.rename(
-                            os.path.join(schemas_dir, f"{selected_db}_pk.json"),
-                            os.path.join(schemas_dir, f"{clean_rename_db}_pk.json"),
-                        )
-                        os.rename(
-                            os.path.join(schemas_dir, f"{selected_db}_desc.txt"),
-                            os.path.join(schemas_dir, f"{clean_rename_db}_desc.txt"),
-                        )
-                        os.rename(
-                            os.path.join(models_dir, f"{selected_db}_model.py"),
-                            os.path.join(models_dir, f"{clean_rename_db}_model.py"),
-                        )
-                        st.success(
-                            f"Database {selected_db} renamed to {clean_rename_db}."
+                            os.rename(
+                                model_file,
+                                os.path.join("models", f"{clean_rename_db}.py"),
+                            )
+
+                    try:
+                        rename_database(
+                            selected_db,
+                            clean_rename_db,
+                            new_db_file,
+                            action=rename_files,
                         )
-                        st.rerun()
-                else:
-                    # Proceed to interact with the database
-                    interact_with_database(selected_db)
-        else:
-            st.write("No databases found.")
+                    except Exception as e:
+                        st.error(f"Error renaming database: {e}")
+                        st.stop()
+                    # Cached results are kept by name, so neither name may serve
+                    # them after the rename
+                    bump_data_version(selected_db)
+                    bump_data_version(clean_rename_db)
+                    st.success(f"Database {selected_db} renamed to {clean_rename_db}.")
+                    st.rerun()
+            else:
+                # Proceed to interact with the database
+                interact_with_database(selected_db)
     else:
         st.write("No databases found.")
 
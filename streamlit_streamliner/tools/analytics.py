@@ -0,0 +1,259 @@
+import datetime
+import json
+import os
+import re
+import threading
+import time
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import streamlit as st
+from sqlalchemy import Integer, literal_column, select
+
+from tools.db_arrow import get_arrow_schema, iter_arrow_batches
+from tools.db_stats import get_table_stats
+
+# DuckDB is optional; without it the analytics panel is not offered
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+ANALYTICS_DIR = "analytics"
+SNAPSHOT_CHUNK_SIZE = 50000
+
+# Rows of a query result sent to the page
+ANALYTICS_ROW_LIMIT = 10000
+
+ROWID_COLUMN = "_snapshot_rowid"
+PART_FILE_PATTERN = re.compile(r"g(\d+)-p(\d+)\.parquet")
+
+
+def is_analytics_available():
+    return duckdb is not None
+
+
+@st.cache_resource
+def get_snapshot_locks():
+    """
+    Returns the locks serializing the snapshot refreshes of each database,
+    shared by all sessions.
+    """
+    return {"locks": {}, "lock": threading.Lock()}
+
+
+def get_snapshot_lock(db_name):
+    registry = get_snapshot_locks()
+    with registry["lock"]:
+        return registry["locks"].setdefault(db_name, threading.Lock())
+
+
+def get_snapshot_dir(db_name):
+    return os.path.join(ANALYTICS_DIR, db_name)
+
+
+def load_snapshot_info(db_name):
+    path = os.path.join(get_snapshot_dir(db_name), "snapshot.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_snapshot_info(db_name, info):
+    path = os.path.join(get_snapshot_dir(db_name), "snapshot.json")
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(info, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def get_snapshot_files(db_name, info):
+    return [os.path.join(get_snapshot_dir(db_name), part) for part in info["parts"]]
+
+
+def write_snapshot_part(engine, table, schema, path, after_rowid=None):
+    """
+    Writes the rows of a table to a Parquet file, only those after
+    ``after_rowid`` if it is given. The file appears under ``path`` only
+    once it is complete.
+
+    Returns:
+        A tuple of (rows written, largest rowid written or None).
+    """
+    rowid = literal_column("rowid", Integer).label(ROWID_COLUMN)
+    statement = select(rowid, *table.columns)
+    if after_rowid is not None:
+        statement = statement.where(literal_column("rowid") > after_rowid)
+    batch_schema = pa.schema([pa.field(ROWID_COLUMN, pa.int64())] + list(schema))
+
+    rows_written = 0
+    max_rowid = None
+    writer = pq.ParquetWriter(f"{path}.tmp", schema)
+    try:
+        for batch in iter_arrow_batches(
+            engine, statement, SNAPSHOT_CHUNK_SIZE, batch_schema
+        ):
+            batch_max = pc.max(batch.column(0)).as_py()
+            if batch_max is not None:
+                max_rowid = (
+                    batch_max if max_rowid is None else max(max_rowid, batch_max)
+                )
+            writer.write_batch(
+                pa.RecordBatch.from_arrays(batch.columns[1:], schema=schema)
+            )
+            rows_written += batch.num_rows
+    except Exception:
+        writer.close()
+        os.remove(f"{path}.tmp")
+        raise
+    writer.close()
+    os.replace(f"{path}.tmp", path)
+    return rows_written, max_rowid
+
+
+def remove_old_generations(db_name, generation):
+    # A query that started before the swap may still read the previous one
+    for file_name in os.listdir(get_snapshot_dir(db_name)):
+        match = PART_FILE_PATTERN.fullmatch(file_name)
+        if match and int(match.group(1)) < generation - 1:
+            os.remove(os.path.join(get_snapshot_dir(db_name), file_name))
+
+
+def refresh_snapshot(engine, model_class, db_name, modified_at):
+    """
+    Brings the Parquet snapshot of a table up to date, so analytic queries
+    never read the SQLite file itself.
+
+    The snapshot records the change count of the stats table at the time it
+    was read. If every change since then was an insert, the new rows are the
+    ones after the largest rowid of the snapshot, and only they are appended
+    as a new part file. Otherwise, or if that does not add up, the snapshot
+    is written again in full.
+
+    Args:
+        engine: The database engine.
+        model_class: The SQLModel table class.
+        db_name: Name of the database.
+        modified_at: When the catalog entry last changed. A snapshot of an
+            older schema is written again in full.
+
+    Returns:
+        A tuple of (snapshot info, refresh) where refresh is "current",
+        "incremental" or "full".
+    """
+    table = model_class.__table__
+    schema = get_arrow_schema(table.columns)
+    snapshot_dir = get_snapshot_dir(db_name)
+
+    with get_snapshot_lock(db_name):
+        info = load_snapshot_info(db_name)
+        # Read before the rows, so a write in between only makes the
+        # snapshot look older than it is
+        stats = get_table_stats(engine, model_class)
+        if info is not None and info["modified_at"] == str(modified_at):
+            changes = stats["change_count"] - info["change_count"]
+            inserted = stats["row_count"] - info["row_count"]
+            if changes == 0 and inserted == 0:
+                return info, "current"
+            if inserted > 0 and changes == inserted:
+                part = f"g{info['generation']:06d}-p{len(info['parts']):06d}.parquet"
+                path = os.path.join(snapshot_dir, part)
+                rows_written, max_rowid = write_snapshot_part(
+                    engine, table, schema, path, info["max_rowid"]
+                )
+                if rows_written == inserted:
+                    info["parts"].append(part)
+                    info["max_rowid"] = max_rowid
+                    info["row_count"] = stats["row_count"]
+                    info["change_count"] = stats["change_count"]
+                    info["refreshed_at"] = str(datetime.datetime.now())
+                    save_snapshot_info(db_name, info)
+                    return info, "incremental"
+                os.remove(path)
+
+        os.makedirs(snapshot_dir, exist_ok=True)
+        generation = info["generation"] + 1 if info is not None else 1
+        part = f"g{generation:06d}-p000000.parquet"
+        rows_written, max_rowid = write_snapshot_part(
+            engine, table, schema, os.path.join(snapshot_dir, part)
+        )
+        info = {
+            "generation": generation,
+            "parts": [part],
+            "max_rowid": max_rowid or 0,
+            "row_count": stats["row_count"],
+            "change_count": stats["change_count"],
+            "modified_at": str(modified_at),
+            "refreshed_at": str(datetime.datetime.now()),
+        }
+        save_snapshot_info(db_name, info)
+        remove_old_generations(db_name, generation)
+        return info, "full"
+
+
+def drop_snapshot(db_name):
+    """
+    Removes the snapshot of a database, e.g. when it is deleted or renamed.
+    """
+    snapshot_dir = get_snapshot_dir(db_name)
+    if not os.path.exists(snapshot_dir):
+        return
+    with get_snapshot_lock(db_name):
+        for file_name in os.listdir(snapshot_dir):
+            os.remove(os.path.join(snapshot_dir, file_name))
+        os.rmdir(snapshot_dir)
+
+
+def quote_literal(value):
+    return "'" + value.replace("'", "''") + "'"
+
+
+def run_analytic_query(snapshots, sql, limit=ANALYTICS_ROW_LIMIT):
+    """
+    Runs a SQL query with DuckDB over table snapshots.
+
+    Every snapshot is a view named after its database. The connection is
+    in memory and can only reach files under ANALYTICS_DIR, and only a
+    single SELECT is accepted, so the query cannot change the databases,
+    the snapshots or any other file.
+
+    Args:
+        snapshots: Dict of {view name: list of Parquet files}.
+        sql: The query, in DuckDB's SQL dialect.
+        limit: Maximum number of rows returned.
+
+    Returns:
+        A dict with table (a pyarrow.Table), truncated and seconds.
+
+    Raises:
+        ValueError: If the SQL is not a single SELECT.
+    """
+    statements = duckdb.extract_statements(sql)
+    if len(statements) != 1 or statements[0].type != duckdb.StatementType.SELECT:
+        raise ValueError("Only a single SELECT query can be run.")
+
+    connection = duckdb.connect()
+    try:
+        allowed_dir = os.path.abspath(ANALYTICS_DIR) + os.sep
+        connection.execute(f"SET allowed_directories = [{quote_literal(allowed_dir)}]")
+        for view_name, files in snapshots.items():
+            file_list = ", ".join(quote_literal(os.path.abspath(f)) for f in files)
+            connection.execute(
+                f'CREATE VIEW "{view_name}" AS SELECT * FROM read_parquet([{file_list}])'
+            )
+        connection.execute("SET enable_external_access = false")
+        connection.execute("SET lock_configuration = true")
+
+        started = time.perf_counter()
+        table = connection.sql(sql).limit(limit + 1).fetch_arrow_table()
+        seconds = time.perf_counter() - started
+    finally:
+        connection.close()
+
+    truncated = table.num_rows > limit
+    return {
+        "table": table.slice(0, limit) if truncated else table,
+        "truncated": truncated,
+        "seconds": seconds,
+    }
@@ -0,0 +1,154 @@
+import datetime
+
+import pandas as pd
+from sqlalchemy import and_, bindparam
+
+from tools.db_engine import run_with_retry
+from tools.db_queries import get_key_columns
+
+
+def coerce_value(column, value):
+    """
+    Converts a value from the grid editor to the type of its column. The
+    editor returns floats for integer columns holding empty cells, NaN or NA
+    for the empty cells themselves, and ISO strings for edited dates.
+    """
+    if value is None or pd.isna(value):
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if python_type in (int, float, str):
+        return python_type(value)
+    if python_type is datetime.datetime:
+        return pd.Timestamp(value).to_pydatetime()
+    if python_type is datetime.date:
+        return pd.Timestamp(value).date()
+    return value
+
+
+def apply_grid_changes(engine, model_class, key_names, rows, changes):
+    """
+    Applies the edits made in an ``st.data_editor`` over a page of records.
+
+    Only the changed cells are written. Rows are deleted, updated and
+    inserted with one executemany per statement shape, all inside a single
+    transaction, so either every change is saved or none is.
+
+    Args:
+        engine: The database engine.
+        model_class: The SQLModel table class.
+        key_names: Column names of the primary key.
+        rows: The records shown in the editor, as dicts, in editor order.
+        changes: The editor state, with edited_rows, added_rows and
+            deleted_rows.
+
+    Returns:
+        A dict with the number of rows updated, inserted and deleted.
+    """
+    table = model_class.__table__
+    key_where = and_(
+        *[
+            column == bindparam(f"key_{column.name}")
+            for column in get_key_columns(model_class, key_names)
+        ]
+    )
+
+    def get_key_params(index):
+        return {f"key_{name}": rows[int(index)][name] for name in key_names}
+
+    deleted_rows = {int(index) for index in changes.get("deleted_rows", [])}
+    deletes = [get_key_params(index) for index in sorted(deleted_rows)]
+
+    # Updates are grouped by the set of columns they change, so each group
+    # is one UPDATE statement executed for many rows
+    updates = {}
+    for index, edits in changes.get("edited_rows", {}).items():
+        if int(index) in deleted_rows or not edits:
+            continue
+        params = get_key_params(index)
+        for name, value in edits.items():
+            params[f"value_{name}"] = coerce_value(table.c[name], value)
+        updates.setdefault(tuple(sorted(edits)), []).append(params)
+
+    inserts = []
+    for added in changes.get("added_rows", []):
+        values = {
+            column.name: coerce_value(column, added.get(column.name))
+            for column in table.columns
+        }
+        if any(value is not None for value in values.values()):
+            inserts.append(values)
+
+    def apply_changes():
+        with engine.begin() as connection:
+            if deletes:
+                connection.execute(table.delete().where(key_where), deletes)
+            for names, params in updates.items():
+                statement = (
+                    table.update()
+                    .where(key_where)
+                    .values({name: bindparam(f"value_{name}") for name in names})
+                )
+                connection.execute(statement, params)
+            if inserts:
+                connection.execute(table.insert(), inserts)
+
+    run_with_retry(apply_changes)
+    return {
+        "updated": sum(len(params) for params in updates.values()),
+        "inserted": len(inserts),
+        "deleted": len(deletes),
+    }
+
+
+def run_bulk_statement(engine, statement, dry_run=False):
+    """
+    Executes one set-based statement and returns the number of rows it
+    affected. A dry run executes it the same way, so the count is exact and
+    constraint errors surface, then rolls it back.
+    """
+
+    def run():
+        with engine.connect() as connection:
+            transaction = connection.begin()
+            try:
+                affected = connection.execute(statement).rowcount
+            except Exception:
+                transaction.rollback()
+                raise
+            if dry_run:
+                transaction.rollback()
+            else:
+                transaction.commit()
+            return affected
+
+    return run_with_retry(run)
+
+
+def bulk_delete(engine, model_class, conditions, dry_run=False):
+    """
+    Deletes every record matching the conditions with a single DELETE. No
+    rows are loaded into Python.
+
+    Returns:
+        The number of records deleted (or that would be, for a dry run).
+    """
+    statement = model_class.__table__.delete().where(*conditions)
+    return run_bulk_statement(engine, statement, dry_run)
+
+
+def bulk_update(engine, model_class, conditions, values, dry_run=False):
+    """
+    Sets columns to new values on every record matching the conditions
+    with a single UPDATE. No rows are loaded into Python.
+
+    Args:
+        values: Dict of {column name: new value}.
+
+    Returns:
+        The number of records updated (or that would be, for a dry run).
+    """
+    statement = model_class.__table__.update().where(*conditions).values(values)
+    return run_bulk_statement(engine, statement, dry_run)
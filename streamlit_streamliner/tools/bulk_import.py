@@ -0,0 +1,306 @@
+import os
+import time
+
+import pandas as pd
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.exc import IntegrityError
+
+from tools.db_engine import run_with_retry
+from tools.db_migrate import immediate_transaction
+
+IMPORT_FILE_TYPES = ["csv", "xlsx", "parquet"]
+IMPORT_CHUNK_SIZE = 50000
+
+# Only this many rejected rows are kept for the report; the rest are counted
+MAX_REJECTED_ROWS = 1000
+
+
+def get_file_size(source):
+    if isinstance(source, str):
+        return os.path.getsize(source)
+    position = source.tell()
+    source.seek(0, os.SEEK_END)
+    size = source.tell()
+    source.seek(position)
+    return size
+
+
+def get_read_fraction(handle, size):
+    try:
+        return min(handle.tell() / size, 1.0)
+    except (OSError, ValueError):
+        return None
+
+
+def iter_csv_chunks(source, chunk_size):
+    # Read every column as text; coerce_chunk decides what is valid
+    size = get_file_size(source) or 1
+    with pd.read_csv(source, chunksize=chunk_size, dtype=str) as reader:
+        handle = source if not isinstance(source, str) else reader.handles.handle
+        for chunk in reader:
+            yield chunk, get_read_fraction(handle, size)
+
+
+def iter_parquet_chunks(source, chunk_size):
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(source)
+    total_rows = parquet_file.metadata.num_rows or 1
+    rows_read = 0
+    for batch in parquet_file.iter_batches(batch_size=chunk_size):
+        rows_read += batch.num_rows
+        yield batch.to_pandas(), rows_read / total_rows
+
+
+def iter_excel_chunks(source, chunk_size):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        worksheet = workbook.active
+        total_rows = worksheet.max_row or None
+        rows = worksheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(name) if name is not None else "" for name in header]
+        buffer = []
+        rows_read = 1
+        for row in rows:
+            buffer.append(row)
+            rows_read += 1
+            if len(buffer) >= chunk_size:
+                fraction = rows_read / total_rows if total_rows else None
+                yield pd.DataFrame(buffer, columns=columns), fraction
+                buffer = []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=columns), 1.0
+    finally:
+        workbook.close()
+
+
+def iter_file_chunks(source, file_name, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Streams a CSV, Excel or Parquet file as DataFrames of at most
+    ``chunk_size`` rows, so only one chunk is held in memory at a time.
+
+    Args:
+        source: A path or a binary file object.
+        file_name: Name of the file, used to pick the reader.
+        chunk_size: Number of rows per chunk.
+
+    Yields:
+        Tuples of (chunk, fraction) where fraction is the approximate share
+        of the file read so far, or None if it is unknown.
+    """
+    extension = os.path.splitext(file_name)[1].lower().lstrip(".")
+    if extension == "csv":
+        return iter_csv_chunks(source, chunk_size)
+    if extension == "parquet":
+        return iter_parquet_chunks(source, chunk_size)
+    if extension == "xlsx":
+        return iter_excel_chunks(source, chunk_size)
+    raise ValueError(f"Unsupported file type: {extension}")
+
+
+def match_columns(chunk, column_types, field_names):
+    """
+    Maps the columns of a file to the columns of the table. A file column
+    matches by the column name or by the original field name of the schema.
+
+    Returns:
+        A dict of {file column: table column}.
+    """
+    lookup = {name.lower(): name for name in column_types}
+    lookup.update(
+        {field.strip().lower(): column for field, column in field_names.items()}
+    )
+    mapping = {}
+    for file_column in chunk.columns:
+        column = lookup.get(str(file_column).strip().lower())
+        if column is not None:
+            mapping[file_column] = column
+    return mapping
+
+
+def coerce_chunk(chunk, column_types, key_names):
+    """
+    Converts a chunk to the column types of the schema with vectorized
+    operations.
+
+    A value that is present in the file but cannot be converted, or a
+    missing primary key value, rejects the whole row.
+
+    Args:
+        chunk: DataFrame whose columns are already named like the table.
+        column_types: Dict of {column: schema data type}.
+        key_names: Primary key columns.
+
+    Returns:
+        A tuple of (valid rows, rejected rows with a "reason" column).
+    """
+    coerced = pd.DataFrame(index=chunk.index)
+    reasons = pd.Series("", index=chunk.index, dtype=object)
+
+    for column, data_type in column_types.items():
+        if column not in chunk.columns:
+            coerced[column] = None
+            continue
+        values = chunk[column]
+        present = values.notna() & (values.astype(str).str.strip() != "")
+        if data_type == "integer":
+            numbers = pd.to_numeric(values, errors="coerce")
+            invalid = present & (numbers.isna() | (numbers % 1 != 0))
+            converted = numbers.where(~invalid).astype("Int64")
+        elif data_type == "float":
+            converted = pd.to_numeric(values, errors="coerce")
+            invalid = present & converted.isna()
+        elif data_type in ("date", "datetime"):
+            timestamps = pd.to_datetime(values, errors="coerce", format="mixed")
+            invalid = present & timestamps.isna()
+            converted = timestamps.dt.date if data_type == "date" else timestamps
+        else:
+            converted = values.astype(str).str.strip()
+            invalid = pd.Series(False, index=chunk.index)
+        reasons = reasons.where(
+            ~invalid, reasons + f"invalid {data_type} in {column}; "
+        )
+        coerced[column] = converted.where(present, None)
+
+    for key_name in key_names:
+        missing_key = coerced[key_name].isna()
+        reasons = reasons.where(~missing_key, reasons + f"missing {key_name}; ")
+
+    rejected_mask = reasons != ""
+    rejected = chunk[rejected_mask].copy()
+    rejected["reason"] = reasons[rejected_mask].str.rstrip("; ")
+    return coerced[~rejected_mask], rejected
+
+
+def to_records(df):
+    """
+    Converts a DataFrame to a list of dicts with None for missing values,
+    the form executemany expects.
+    """
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+def insert_records(engine, statement, records, index):
+    """
+    Inserts a chunk of records in one transaction. The whole chunk is
+    inserted with a single executemany; only if one of its rows breaks a
+    constraint are the rows inserted one by one, each in its own savepoint,
+    to find the rows at fault.
+
+    Args:
+        engine: The database engine.
+        statement: The INSERT statement.
+        records: The rows, as dicts.
+        index: The labels of the rows in their chunk, one per record.
+
+    Returns:
+        A tuple of (rows inserted, {row label: error message}).
+    """
+    with immediate_transaction(engine) as connection:
+        try:
+            with connection.begin_nested():
+                return connection.execute(statement, records).rowcount, {}
+        except IntegrityError:
+            pass
+        inserted = 0
+        failures = {}
+        for label, record in zip(index, records):
+            try:
+                with connection.begin_nested():
+                    inserted += connection.execute(statement, record).rowcount
+            except IntegrityError as e:
+                failures[label] = str(e.orig)
+        return inserted, failures
+
+
+def bulk_import(
+    engine,
+    model_class,
+    chunks,
+    column_types,
+    field_names,
+    key_names,
+    progress=None,
+):
+    """
+    Inserts the rows of a chunked file into the table of ``model_class``.
+
+    Each chunk is coerced to the schema and inserted with a single
+    executemany inside its own transaction. Rows whose primary key already
+    exists are skipped and counted as duplicates. Rows breaking another
+    constraint, such as a unique column or a NOT NULL column, are rejected
+    with the database error as the reason.
+
+    Args:
+        engine: The database engine.
+        model_class: The SQLModel table class.
+        chunks: An iterator of (chunk, fraction), see ``iter_file_chunks``.
+        column_types: Dict of {column: schema data type}.
+        field_names: Dict of {original field name: column}.
+        key_names: Primary key columns.
+        progress: Optional callable receiving the running summary after
+            each chunk.
+
+    Returns:
+        A summary dict with rows_read, inserted, duplicates, rejected,
+        rows_per_second, seconds and rejected_rows (a DataFrame holding at
+        most MAX_REJECTED_ROWS rows).
+    """
+    table = model_class.__table__
+    statement = insert(table).on_conflict_do_nothing(index_elements=key_names)
+    summary = {
+        "rows_read": 0,
+        "inserted": 0,
+        "duplicates": 0,
+        "rejected": 0,
+        "rows_per_second": 0.0,
+        "seconds": 0.0,
+        "fraction": 0.0,
+    }
+    rejected_samples = []
+    rejected_kept = 0
+    started = time.perf_counter()
+
+    for chunk, fraction in chunks:
+        mapping = match_columns(chunk, column_types, field_names)
+        chunk = chunk[list(mapping)].rename(columns=mapping)
+        valid, rejected = coerce_chunk(chunk, column_types, key_names)
+
+        if len(valid):
+            records = to_records(valid)
+            inserted, failures = run_with_retry(
+                lambda: insert_records(engine, statement, records, valid.index)
+            )
+            summary["inserted"] += inserted
+            summary["duplicates"] += len(records) - inserted - len(failures)
+            if failures:
+                failed = chunk.loc[list(failures)].copy()
+                failed["reason"] = pd.Series(failures)
+                rejected = pd.concat([rejected, failed])
+
+        summary["rows_read"] += len(chunk)
+        summary["rejected"] += len(rejected)
+        if len(rejected) and rejected_kept < MAX_REJECTED_ROWS:
+            sample = rejected.head(MAX_REJECTED_ROWS - rejected_kept)
+            rejected_samples.append(sample)
+            rejected_kept += len(sample)
+
+        summary["seconds"] = time.perf_counter() - started
+        summary["rows_per_second"] = summary["rows_read"] / max(
+            summary["seconds"], 1e-9
+        )
+        if fraction is not None:
+            summary["fraction"] = min(fraction, 1.0)
+        if progress is not None:
+            progress(summary)
+
+    summary["fraction"] = 1.0
+    summary["rejected_rows"] = (
+        pd.concat(rejected_samples) if rejected_samples else pd.DataFrame()
+    )
+    return summary
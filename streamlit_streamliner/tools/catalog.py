@@ -0,0 +1,246 @@
+import datetime
+import json
+import os
+
+import streamlit as st
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Float,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    select,
+)
+
+from tools.db_engine import get_engine
+
+CATALOG_DIR = "catalog"
+CATALOG_FILE = os.path.join(CATALOG_DIR, "catalog.db")
+
+# The catalog has its own MetaData so its tables are never created in the
+# generated databases
+catalog_metadata = MetaData()
+
+# One row per generated database. ``name`` is the primary key, so every
+# lookup by name is an index search. ``table_name`` does not change when a
+# database is renamed, because it is the name of the table inside the file.
+databases_table = Table(
+    "databases",
+    catalog_metadata,
+    Column("name", String, primary_key=True),
+    Column("table_name", String, nullable=False),
+    Column("schema_json", Text, nullable=False),
+    Column("primary_keys_json", Text, nullable=False),
+    Column("description", Text),
+    Column("db_path", String, nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    Column("modified_at", DateTime, nullable=False),
+)
+
+# One row per background job, see tools/jobs.py. Rows are kept after the job
+# has ended so that its outcome can still be shown.
+jobs_table = Table(
+    "jobs",
+    catalog_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("db_name", String, nullable=False, index=True),
+    Column("kind", String, nullable=False),
+    Column("label", Text, nullable=False),
+    Column("status", String, nullable=False),
+    Column("progress", Float),
+    Column("message", Text),
+    Column("error", Text),
+    Column("result_json", Text),
+    Column("created_at", DateTime, nullable=False),
+    Column("started_at", DateTime),
+    Column("finished_at", DateTime),
+)
+
+
+@st.cache_resource
+def init_catalog():
+    """
+    Creates the catalog once per process and imports the databases that were
+    generated before it existed.
+    """
+    if not os.path.exists(CATALOG_DIR):
+        os.makedirs(CATALOG_DIR)
+    engine = get_engine(CATALOG_FILE)
+    catalog_metadata.create_all(engine)
+    import_legacy_side_files(engine)
+    return engine
+
+
+def get_catalog_engine():
+    return init_catalog()
+
+
+def import_legacy_side_files(engine, schemas_dir="schemas", db_dir="databases"):
+    """
+    Moves the databases described by the old ``schemas/<db>_schema.json``,
+    ``_pk.json`` and ``_desc.txt`` files into the catalog, then removes those
+    files so they cannot bring back a renamed or deleted database.
+    """
+    if not os.path.exists(schemas_dir):
+        return
+    migrated_files = []
+    with engine.begin() as connection:
+        known = set(connection.execute(select(databases_table.c.name)).scalars())
+        for file_name in os.listdir(schemas_dir):
+            if not file_name.endswith("_schema.json"):
+                continue
+            db_name = file_name[: -len("_schema.json")]
+            pk_file = os.path.join(schemas_dir, f"{db_name}_pk.json")
+            if db_name in known or not os.path.exists(pk_file):
+                continue
+            with open(os.path.join(schemas_dir, file_name), "r") as f:
+                schema_json = f.read()
+            with open(pk_file, "r") as f:
+                primary_keys = json.load(f)
+            desc_file = os.path.join(schemas_dir, f"{db_name}_desc.txt")
+            description = None
+            if os.path.exists(desc_file):
+                with open(desc_file, "r") as f:
+                    description = f.read()
+            migrated_files += [os.path.join(schemas_dir, file_name), pk_file, desc_file]
+            db_path = os.path.join(db_dir, f"{db_name}.db")
+            if os.path.exists(db_path):
+                created_at = datetime.datetime.fromtimestamp(os.path.getctime(db_path))
+            else:
+                created_at = datetime.datetime.now()
+            connection.execute(
+                databases_table.insert().values(
+                    name=db_name,
+                    table_name=f"{db_name}_model",
+                    schema_json=schema_json,
+                    primary_keys_json=json.dumps(primary_keys),
+                    description=description,
+                    db_path=db_path,
+                    created_at=created_at,
+                    modified_at=created_at,
+                )
+            )
+
+    # Only removed once the catalog transaction has committed
+    for path in migrated_files:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def entry_to_dict(row):
+    entry = dict(row._mapping)
+    entry["primary_keys"] = json.loads(entry.pop("primary_keys_json"))
+    return entry
+
+
+def list_database_entries():
+    """
+    Returns the catalog entries of all databases, in alphabetical order.
+    """
+    with get_catalog_engine().connect() as connection:
+        rows = connection.execute(
+            select(databases_table).order_by(databases_table.c.name)
+        ).all()
+    return [entry_to_dict(row) for row in rows]
+
+
+def list_databases():
+    """
+    Returns the names of all catalogued databases, in alphabetical order.
+    """
+    with get_catalog_engine().connect() as connection:
+        return list(
+            connection.execute(
+                select(databases_table.c.name).order_by(databases_table.c.name)
+            ).scalars()
+        )
+
+
+def get_database(db_name):
+    """
+    Returns the catalog entry of a database, or None if it is not catalogued.
+
+    Returns:
+        A dict with name, table_name, schema_json, primary_keys, description,
+        db_path, created_at and modified_at.
+    """
+    with get_catalog_engine().connect() as connection:
+        row = connection.execute(
+            select(databases_table).where(databases_table.c.name == db_name)
+        ).first()
+    return entry_to_dict(row) if row is not None else None
+
+
+def save_database(
+    db_name, table_name, schema_json, primary_keys, description, db_path, action=None
+):
+    """
+    Adds or replaces the catalog entry of a database.
+
+    Args:
+        action: Optional callable run inside the catalog transaction, e.g. to
+            write files. If it raises, the catalog is left unchanged.
+    """
+    now = datetime.datetime.now()
+    values = {
+        "table_name": table_name,
+        "schema_json": schema_json,
+        "primary_keys_json": json.dumps(primary_keys),
+        "description": description,
+        "db_path": db_path,
+        "modified_at": now,
+    }
+    with get_catalog_engine().begin() as connection:
+        updated = connection.execute(
+            databases_table.update()
+            .where(databases_table.c.name == db_name)
+            .values(**values)
+        ).rowcount
+        if not updated:
+            connection.execute(
+                databases_table.insert().values(name=db_name, created_at=now, **values)
+            )
+        if action is not None:
+            action()
+
+
+def rename_database(db_name, new_db_name, new_db_path, action=None):
+    """
+    Renames a catalogued database. ``action`` runs inside the transaction,
+    e.g. to rename the files, and rolls the catalog back if it raises.
+    """
+    with get_catalog_engine().begin() as connection:
+        connection.execute(
+            databases_table.update()
+            .where(databases_table.c.name == db_name)
+            .values(
+                name=new_db_name,
+                db_path=new_db_path,
+                modified_at=datetime.datetime.now(),
+            )
+        )
+        connection.execute(
+            jobs_table.update()
+            .where(jobs_table.c.db_name == db_name)
+            .values(db_name=new_db_name)
+        )
+        if action is not None:
+            action()
+
+
+def delete_database(db_name, action=None):
+    """
+    Removes a database from the catalog. ``action`` runs inside the
+    transaction, e.g. to delete the files, and rolls the catalog back if it
+    raises.
+    """
+    with get_catalog_engine().begin() as connection:
+        connection.execute(
+            databases_table.delete().where(databases_table.c.name == db_name)
+        )
+        connection.execute(jobs_table.delete().where(jobs_table.c.db_name == db_name))
+        if action is not None:
+            action()
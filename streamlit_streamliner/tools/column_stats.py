@@ -0,0 +1,97 @@
+from sqlalchemy import Float, distinct, func, literal, select
+
+from tools.db_arrow import read_arrow_table
+
+# Only the largest groups of a breakdown are returned
+GROUP_LIMIT = 50
+
+
+def is_numeric(column):
+    try:
+        return column.type.python_type in (int, float)
+    except NotImplementedError:
+        return False
+
+
+def profile_columns(engine, model_class, column_names):
+    """
+    Computes the statistics of several columns with SQL aggregates, in a
+    single scan of the table.
+
+    Args:
+        engine: The database engine.
+        model_class: The SQLModel table class.
+        column_names: Names of the columns to profile.
+
+    Returns:
+        A dict of {column name: statistics}, each with rows, non_null,
+        null_rate, distinct, min, max and avg (None for text columns).
+    """
+    table = model_class.__table__
+    aggregates = [func.count()]
+    for column_name in column_names:
+        column = table.c[column_name]
+        aggregates += [
+            func.count(column),
+            func.count(distinct(column)),
+            func.min(column),
+            func.max(column),
+            func.avg(column) if is_numeric(column) else literal(None),
+        ]
+    with engine.connect() as connection:
+        result = connection.execute(select(*aggregates).select_from(table)).one()
+
+    row_count = result[0]
+    profiles = {}
+    for index, column_name in enumerate(column_names):
+        non_null, distinct_count, minimum, maximum, average = result[
+            1 + index * 5 : 6 + index * 5
+        ]
+        profiles[column_name] = {
+            "rows": row_count,
+            "non_null": non_null,
+            "null_rate": (row_count - non_null) / row_count if row_count else 0.0,
+            "distinct": distinct_count,
+            "min": minimum,
+            "max": maximum,
+            "avg": average,
+        }
+    return profiles
+
+
+def group_by_column(
+    engine, model_class, group_name, value_name=None, limit=GROUP_LIMIT
+):
+    """
+    Counts the records per value of a column, largest groups first, with
+    the min, max and average of an optional numeric value column.
+
+    Returns:
+        A tuple of (groups, group_count) where groups is a pyarrow.Table
+        holding at most ``limit`` groups and group_count is the number of
+        groups in the table.
+    """
+    table = model_class.__table__
+    group_column = table.c[group_name]
+    aggregates = [func.count().label("count")]
+    if value_name is not None:
+        value_column = table.c[value_name]
+        aggregates += [
+            func.min(value_column).label(f"min_{value_name}"),
+            func.max(value_column).label(f"max_{value_name}"),
+            func.avg(value_column, type_=Float).label(f"avg_{value_name}"),
+        ]
+    statement = (
+        select(group_column, *aggregates)
+        .group_by(group_column)
+        .order_by(func.count().desc(), group_column)
+        .limit(limit)
+    )
+    count_statement = select(func.count(distinct(group_column)))
+    groups = read_arrow_table(engine, statement)
+    with engine.connect() as connection:
+        group_count = connection.execute(count_statement).scalar_one()
+    # COUNT(DISTINCT) leaves out NULL, which GROUP BY keeps as a group
+    if groups.column(group_name).null_count:
+        group_count += 1
+    return groups, group_count
@@ -0,0 +1,102 @@
+import datetime
+
+import pandas as pd
+import pyarrow as pa
+
+ARROW_TYPES = {
+    int: pa.int64(),
+    float: pa.float64(),
+    str: pa.string(),
+    bool: pa.bool_(),
+    datetime.date: pa.date32(),
+    datetime.datetime: pa.timestamp("us"),
+}
+
+# Nullable pandas dtypes, so integer columns holding NULLs stay integers
+# instead of turning into floats
+PANDAS_TYPES = {
+    pa.int64(): pd.Int64Dtype(),
+    pa.bool_(): pd.BooleanDtype(),
+    pa.string(): pd.StringDtype(),
+}
+
+
+def get_arrow_type(column):
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        python_type = str
+    return ARROW_TYPES.get(python_type, pa.string())
+
+
+def get_arrow_schema(columns):
+    """
+    Builds the Arrow schema of a set of columns from their SQL types, so
+    every batch is built with the same types whatever values it happens to
+    hold.
+
+    Args:
+        columns: Table columns or labelled column expressions, in the order
+            of the SELECT.
+    """
+    return pa.schema(
+        [pa.field(column.name, get_arrow_type(column)) for column in columns]
+    )
+
+
+def rows_to_batch(rows, schema):
+    """
+    Turns result rows into an Arrow record batch column by column, without
+    building a dict or an object per row.
+    """
+    columns = zip(*rows) if rows else [[] for _ in schema]
+    return pa.record_batch(
+        [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+        schema=schema,
+    )
+
+
+def iter_arrow_batches(engine, statement, chunk_size, schema=None):
+    """
+    Runs a Core SELECT and yields its result as Arrow record batches of at
+    most ``chunk_size`` rows, fetched straight from one cursor.
+
+    Args:
+        engine: The database engine.
+        statement: A SQLAlchemy SELECT.
+        chunk_size: Number of rows per batch.
+        schema: The Arrow schema of the result, by default built from the
+            selected columns.
+
+    Yields:
+        pyarrow.RecordBatch objects.
+    """
+    if schema is None:
+        schema = get_arrow_schema(statement.selected_columns)
+    with engine.connect() as connection:
+        result = connection.execution_options(yield_per=chunk_size).execute(statement)
+        for rows in result.partitions(chunk_size):
+            yield rows_to_batch(rows, schema)
+
+
+def read_arrow_table(engine, statement, schema=None):
+    """
+    Runs a Core SELECT and returns its whole result as an Arrow table, see
+    ``iter_arrow_batches``. Meant for bounded results such as a page.
+
+    Returns:
+        A pyarrow.Table. It is immutable, so it can be shared through the
+        query cache.
+    """
+    if schema is None:
+        schema = get_arrow_schema(statement.selected_columns)
+    with engine.connect() as connection:
+        rows = connection.execute(statement).all()
+    return pa.Table.from_batches([rows_to_batch(rows, schema)], schema=schema)
+
+
+def to_dataframe(table):
+    """
+    Converts an Arrow table to a DataFrame with the dtypes of its schema.
+    """
+    return table.to_pandas(types_mapper=PANDAS_TYPES.get)
@@ -0,0 +1,82 @@
+import threading
+import time
+
+import streamlit as st
+
+from tools.db_stats import get_table_stats
+from tools.query_cache import bump_data_version, get_data_version
+
+# Sessions polling the same database within this many seconds share one read
+# of its change count
+CHANGE_CHECK_INTERVAL = 1.0
+
+
+@st.cache_resource
+def get_change_registry():
+    """
+    Returns the last change count read from each database and when it was
+    read, shared by all sessions.
+    """
+    return {"checks": {}, "lock": threading.Lock()}
+
+
+def check_for_changes(engine, model_class, db_name, max_age=0.0):
+    """
+    Finds out whether the table of a database changed since it was last
+    checked, and if so bumps its data version so that no session is served
+    the cached results of the old data.
+
+    The change count of the stats table is raised by triggers on every
+    write, so this also sees the writes of background jobs and of other
+    processes, which never call ``bump_data_version`` in this one. Reading
+    it is a single primary key lookup. Writes of this process call
+    ``mark_data_changed`` instead, so they are not counted a second time.
+
+    Args:
+        engine: The database engine.
+        model_class: The SQLModel table class.
+        db_name: Name of the database.
+        max_age: Reuse the last check if it is at most this many seconds
+            old, so that many sessions polling the same database only read
+            it once.
+
+    Returns:
+        The data version of the database, see
+        ``tools.query_cache.get_data_version``.
+    """
+    registry = get_change_registry()
+    last_check = registry["checks"].get(db_name)
+    if last_check is not None and time.monotonic() - last_check[1] <= max_age:
+        return get_data_version(db_name)
+
+    change_count = get_table_stats(engine, model_class)["change_count"]
+    with registry["lock"]:
+        last_check = registry["checks"].get(db_name)
+        registry["checks"][db_name] = (change_count, time.monotonic())
+    if last_check is not None and last_check[0] != change_count:
+        bump_data_version(db_name)
+    return get_data_version(db_name)
+
+
+def mark_data_changed(engine, model_class, db_name):
+    """
+    Bumps the data version of a database after a write of this process and
+    records its change count, so that the next ``check_for_changes`` does
+    not bump it again for the same write.
+
+    The count is read before the bump: every change it includes was
+    committed before the bump, so none of them can be missed. The version
+    is bumped even if the count cannot be read.
+
+    Args:
+        engine: The database engine.
+        model_class: The SQLModel table class.
+        db_name: Name of the database.
+    """
+    registry = get_change_registry()
+    try:
+        change_count = get_table_stats(engine, model_class)["change_count"]
+        with registry["lock"]:
+            registry["checks"][db_name] = (change_count, time.monotonic())
+    finally:
+        bump_data_version(db_name)
@@ -0,0 +1,280 @@
+import os
+import random
+import threading
+import time
+
+import streamlit as st
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+# Bounds for the connection pool of each database file
+POOL_SIZE = 5
+MAX_OVERFLOW = 5
+POOL_TIMEOUT = 30
+
+# Connection profile applied to every new SQLite connection. WAL lets readers
+# and a writer work at the same time; busy_timeout makes SQLite wait for a
+# lock instead of failing straight away.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "cache_size": -64000,  # Negative values are in KiB, so 64 MB
+    "mmap_size": 268435456,  # 256 MB
+    "temp_store": "MEMORY",
+}
+
+# Files making up a database in WAL mode: the database, its write-ahead log
+# and the shared memory index of the log
+DATABASE_FILE_SUFFIXES = ("", "-wal", "-shm")
+
+# Backoff used when a write still fails with a locked database
+RETRY_ATTEMPTS = 5
+RETRY_BASE_DELAY = 0.05
+RETRY_MAX_DELAY = 1.0
+
+
+class PoolStats:
+    """
+    Counters describing how a database's connection pool is used.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record_wait(self, wait, timed_out=False):
+        with self.lock:
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            if timed_out:
+                self.timeouts += 1
+
+    def record_checkout(self):
+        with self.lock:
+            self.checkouts += 1
+
+    def record_connect(self):
+        with self.lock:
+            self.connects += 1
+
+    def as_dict(self):
+        with self.lock:
+            average_wait = self.total_wait / self.checkouts if self.checkouts else 0.0
+            return {
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "timeouts": self.timeouts,
+                "average_wait_ms": average_wait * 1000,
+                "max_wait_ms": self.max_wait * 1000,
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    A QueuePool that records how long each checkout waited for a connection.
+    """
+
+    stats = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            if self.stats is not None:
+                self.stats.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        if self.stats is not None:
+            self.stats.record_wait(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() replaces the pool; keep counting into the same stats
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+@st.cache_resource
+def get_engine_registry():
+    """
+    Returns the process-wide registry of engines, shared by all sessions.
+    """
+    return {"engines": {}, "stats": {}, "lock": threading.Lock()}
+
+
+def get_registry_key(db_file):
+    return os.path.abspath(db_file)
+
+
+def apply_pragmas(pragmas):
+    """
+    Returns a "connect" event listener that applies the given pragmas.
+    """
+
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+    return on_connect
+
+
+def get_engine(db_file, pragmas=None):
+    """
+    Returns the shared engine of a SQLite database file, creating it on
+    first use. Every session uses the same engine and bounded pool.
+
+    Args:
+        db_file: Path to the SQLite database file.
+        pragmas: Pragmas overriding ``SQLITE_PRAGMAS``. Only used when the
+            engine is created.
+
+    Returns:
+        The SQLAlchemy engine.
+    """
+    registry = get_engine_registry()
+    key = get_registry_key(db_file)
+    engine = registry["engines"].get(key)
+    if engine is not None:
+        return engine
+
+    with registry["lock"]:
+        if key not in registry["engines"]:
+            stats = PoolStats()
+            engine = create_engine(
+                f"sqlite:///{db_file}",
+                poolclass=InstrumentedQueuePool,
+                pool_size=POOL_SIZE,
+                max_overflow=MAX_OVERFLOW,
+                pool_timeout=POOL_TIMEOUT,
+                connect_args={"check_same_thread": False},
+            )
+            engine.pool.stats = stats
+            event.listen(
+                engine, "connect", apply_pragmas({**SQLITE_PRAGMAS, **(pragmas or {})})
+            )
+            event.listen(engine, "checkout", lambda *args: stats.record_checkout())
+            event.listen(engine, "connect", lambda *args: stats.record_connect())
+            registry["stats"][key] = stats
+            registry["engines"][key] = engine
+        return registry["engines"][key]
+
+
+def dispose_engine(db_file):
+    """
+    Closes the pooled connections of a database file and removes its engine
+    from the registry. Must be called before the file is deleted or renamed.
+
+    The write-ahead log is checkpointed first so that the database file holds
+    all of its data on its own.
+
+    Raises:
+        RuntimeError: If the log could not be fully checkpointed because
+            another connection still reads or writes the database. The
+            files must then be left alone.
+    """
+    registry = get_engine_registry()
+    key = get_registry_key(db_file)
+    with registry["lock"]:
+        engine = registry["engines"].pop(key, None)
+        registry["stats"].pop(key, None)
+    if engine is None:
+        return
+    try:
+        with engine.connect() as connection:
+            busy, log_frames, checkpointed_frames = connection.exec_driver_sql(
+                "PRAGMA wal_checkpoint(TRUNCATE)"
+            ).one()
+    finally:
+        engine.dispose()
+    if busy or checkpointed_frames != log_frames:
+        raise RuntimeError(
+            f"The database {os.path.basename(db_file)} is still in use, so "
+            "its write-ahead log could not be written back. Try again once "
+            "other sessions and jobs are done with it."
+        )
+
+
+def get_pool_stats(db_file):
+    """
+    Returns the pool counters of a database file, or None if it has no engine.
+    """
+    registry = get_engine_registry()
+    key = get_registry_key(db_file)
+    engine = registry["engines"].get(key)
+    stats = registry["stats"].get(key)
+    if engine is None or stats is None:
+        return None
+    pool_stats = stats.as_dict()
+    pool_stats["checked_out"] = engine.pool.checkedout()
+    pool_stats["pool_size"] = engine.pool.size()
+    pool_stats["engines_in_process"] = len(registry["engines"])
+    return pool_stats
+
+
+def is_locked_error(error):
+    """
+    Returns True if the error is SQLite reporting lock contention.
+    """
+    message = str(getattr(error, "orig", error)).lower()
+    return "database is locked" in message or "database is busy" in message
+
+
+def run_with_retry(operation, attempts=RETRY_ATTEMPTS):
+    """
+    Runs ``operation`` and retries it with exponential backoff and jitter
+    while SQLite reports the database as locked.
+
+    The operation must do its whole unit of work, including opening the
+    session and committing, so that it can be run again from the start.
+
+    Args:
+        operation: A callable taking no arguments.
+        attempts: Maximum number of attempts.
+
+    Returns:
+        The return value of ``operation``.
+    """
+    for attempt in range(attempts):
+        try:
+            return operation()
+        except OperationalError as e:
+            if not is_locked_error(e) or attempt == attempts - 1:
+                raise
+            delay = min(RETRY_BASE_DELAY * 2**attempt, RETRY_MAX_DELAY)
+            time.sleep(delay * random.uniform(0.5, 1.5))
+
+
+def vacuum_database(engine):
+    """
+    Rebuilds a database file with VACUUM, which returns the pages freed by
+    deleted rows and defragments the tables and indexes.
+
+    VACUUM cannot run inside a transaction and may renumber the rowids of
+    tables without an INTEGER PRIMARY KEY.
+
+    Returns:
+        A dict with size_before and size_after, in bytes.
+    """
+    db_file = engine.url.database
+    size_before = os.path.getsize(db_file)
+
+    def run():
+        with engine.connect().execution_options(
+            isolation_level="AUTOCOMMIT"
+        ) as connection:
+            connection.exec_driver_sql("VACUUM")
+            # In WAL mode the file only shrinks once the log is checkpointed
+            connection.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    run_with_retry(run)
+    return {"size_before": size_before, "size_after": os.path.getsize(db_file)}
@@ -0,0 +1,99 @@
+import datetime
+
+from sqlalchemy import Date, DateTime
+
+# Filters are kept as hashable tuples of (column, operator, value) so they
+# can be part of a query cache key. The operators offered per data type:
+FILTER_OPERATORS = {
+    "integer": ["between"],
+    "float": ["between"],
+    "string": ["contains", "starts with", "equals"],
+    "date": ["between dates"],
+    "datetime": ["between dates"],
+}
+
+
+def get_prefix_bound(prefix):
+    """
+    Returns the smallest string greater than every string starting with
+    ``prefix``, or None if there is none.
+    """
+    for index in range(len(prefix) - 1, -1, -1):
+        if ord(prefix[index]) < 0x10FFFF:
+            return prefix[:index] + chr(ord(prefix[index]) + 1)
+    return None
+
+
+def get_date_bound(column, day):
+    """
+    Converts a date to a bound for a date column. Columns created before the
+    native date types store dates as ISO text and compare as strings.
+    """
+    if day is None:
+        return None
+    if isinstance(column.type, DateTime):
+        return datetime.datetime.combine(day, datetime.time())
+    if isinstance(column.type, Date):
+        return day
+    return day.isoformat()
+
+
+def compile_filter(column, operator, value):
+    """
+    Compiles one filter to a SQLAlchemy condition. Values are always bound
+    as parameters.
+
+    "starts with" and the ranges become plain comparisons, which SQLite can
+    answer from an index on the column. "contains" has to look at every row.
+
+    Returns:
+        A list of conditions, all of which must hold.
+    """
+    if operator == "between":
+        low, high = value
+        conditions = []
+        if low is not None:
+            conditions.append(column >= low)
+        if high is not None:
+            conditions.append(column <= high)
+        return conditions
+    if operator == "between dates":
+        # The upper bound is exclusive so values with a time still match
+        low, high = value
+        high = high + datetime.timedelta(days=1) if high is not None else None
+        low, high = [get_date_bound(column, bound) for bound in (low, high)]
+        conditions = []
+        if low is not None:
+            conditions.append(column >= low)
+        if high is not None:
+            conditions.append(column < high)
+        return conditions
+    if operator == "starts with":
+        conditions = [column >= value]
+        upper_bound = get_prefix_bound(value)
+        if upper_bound is not None:
+            conditions.append(column < upper_bound)
+        return conditions
+    if operator == "contains":
+        return [column.contains(value, autoescape=True)]
+    if operator == "equals":
+        return [column == value]
+    raise ValueError(f"Unsupported filter operator: {operator}")
+
+
+def compile_filters(model_class, filters):
+    """
+    Compiles filters to the WHERE conditions of a record query.
+
+    Args:
+        model_class: The SQLModel table class.
+        filters: A tuple of (column name, operator, value) tuples.
+
+    Returns:
+        A list of SQLAlchemy conditions, all of which must hold.
+    """
+    table = model_class.__table__
+    conditions = []
+    for column_name, operator, value in filters:
+        conditions += compile_filter(table.c[column_name], operator, value)
+    return conditions
@@ -0,0 +1,88 @@
+from sqlalchemy import text
+
+from tools.db_engine import run_with_retry
+from tools.db_stats import quote_name
+
+# How SQLite reports where an index comes from
+INDEX_ORIGINS = {"c": "index", "u": "unique constraint", "pk": "primary key"}
+
+
+def get_index_name(table_name, columns, unique=False):
+    """
+    Returns the default name of an index, in the same form SQLModel uses for
+    ``Field(index=True)``.
+    """
+    prefix = "ux" if unique else "ix"
+    return f"{prefix}_{table_name}_{'_'.join(columns)}"
+
+
+def list_indexes(engine, table_name):
+    """
+    Lists the indexes of a table, including the ones SQLite creates for
+    primary keys and unique constraints.
+
+    Args:
+        engine: The database engine.
+        table_name: Name of the table.
+
+    Returns:
+        A list of dicts with name, columns, unique, origin and droppable.
+        Only indexes created with CREATE INDEX can be dropped.
+    """
+    indexes = []
+    with engine.connect() as connection:
+        index_rows = connection.execute(
+            text(f"PRAGMA index_list({quote_name(engine, table_name)})")
+        ).all()
+        for index_row in index_rows:
+            column_rows = connection.execute(
+                text(f"PRAGMA index_info({quote_name(engine, index_row.name)})")
+            ).all()
+            indexes.append(
+                {
+                    "name": index_row.name,
+                    "columns": [
+                        column_row.name
+                        for column_row in sorted(column_rows, key=lambda r: r.seqno)
+                    ],
+                    "unique": bool(index_row.unique),
+                    "origin": INDEX_ORIGINS.get(index_row.origin, index_row.origin),
+                    "droppable": index_row.origin == "c",
+                }
+            )
+    return sorted(indexes, key=lambda index: index["name"])
+
+
+def create_index(engine, table_name, index_name, columns, unique=False):
+    """
+    Adds an index to an existing table. The table keeps its data; SQLite
+    builds the index from the rows already in it.
+
+    Raises:
+        sqlalchemy.exc.IntegrityError: If ``unique`` is set and the table
+            already holds duplicate values.
+    """
+    column_list = ", ".join(quote_name(engine, column) for column in columns)
+    statement = text(
+        f"CREATE {'UNIQUE ' if unique else ''}INDEX {quote_name(engine, index_name)} "
+        f"ON {quote_name(engine, table_name)} ({column_list})"
+    )
+
+    def run():
+        with engine.begin() as connection:
+            connection.execute(statement)
+
+    run_with_retry(run)
+
+
+def drop_index(engine, index_name):
+    """
+    Drops an index created with CREATE INDEX.
+    """
+    statement = text(f"DROP INDEX IF EXISTS {quote_name(engine, index_name)}")
+
+    def run():
+        with engine.begin() as connection:
+            connection.execute(statement)
+
+    run_with_retry(run)
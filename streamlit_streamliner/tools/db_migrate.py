@@ -0,0 +1,704 @@
+import sqlite3
+from contextlib import contextmanager
+
+from sqlalchemy import Date, DateTime, MetaData, UniqueConstraint, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.schema import CreateTable
+
+from tools.db_engine import run_with_retry
+from tools.db_indexes import create_index, drop_index, list_indexes
+from tools.db_search import (
+    drop_search_index,
+    get_indexed_search_columns,
+    get_search_table_name,
+)
+from tools.db_stats import drop_stats_triggers, quote_name
+
+# Declared column types of the native date types
+DATE_DECLARED_TYPES = ("DATE", "DATETIME")
+
+# Schema data types of the declared column types; anything else is text
+DATA_TYPES = {
+    "INTEGER": "integer",
+    "FLOAT": "float",
+    "DATE": "date",
+    "DATETIME": "datetime",
+}
+
+# Rows copied per transaction when a table is copied while in use
+COPY_BATCH_SIZE = 50000
+
+
+def get_declared_types(connection, table_name):
+    """
+    Returns the declared type of every column of a table, upper case, or an
+    empty dict if the table does not exist.
+    """
+    rows = connection.execute(
+        text(f"PRAGMA table_info({quote_name(connection, table_name)})")
+    ).all()
+    return {row.name: row.type.upper() for row in rows}
+
+
+def find_text_date_columns(engine, table_name, date_columns):
+    """
+    Finds the date columns of an existing table that still store dates as
+    free-form text, as tables generated before the native date types did.
+
+    Args:
+        engine: The database engine.
+        table_name: Name of the table.
+        date_columns: Names of the columns the schema declares as dates.
+
+    Returns:
+        The names of the date columns declared with a text type.
+    """
+    with engine.connect() as connection:
+        declared_types = get_declared_types(connection, table_name)
+    return [
+        column
+        for column in date_columns
+        if column in declared_types
+        and declared_types[column] not in DATE_DECLARED_TYPES
+    ]
+
+
+def count_unreadable_dates(engine, table_name, columns):
+    """
+    Counts the non-empty values of text date columns that SQLite cannot
+    read as a date, and would be emptied by ``migrate_text_dates``.
+
+    Returns:
+        A dict of {column: count}.
+    """
+    if not columns:
+        return {}
+    checks = ", ".join(
+        f"SUM(CASE WHEN TRIM({quote_name(engine, column)}) != '' "
+        f"AND date({quote_name(engine, column)}) IS NULL THEN 1 ELSE 0 END)"
+        for column in columns
+    )
+    statement = text(f"SELECT {checks} FROM {quote_name(engine, table_name)}")
+    with engine.connect() as connection:
+        counts = connection.execute(statement).one()
+    return {column: count or 0 for column, count in zip(columns, counts)}
+
+
+def convert_value(value, data_type):
+    """
+    Converts a stored value to a number or text when a column changes type,
+    or returns None if it cannot be converted. Available in SQL as
+    ``convert_value(value, data_type)`` during table copies.
+    """
+    if value is None:
+        return None
+    if data_type == "string":
+        return str(value)
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    if data_type == "integer":
+        return int(number) if number.is_integer() else None
+    return number
+
+
+def register_functions(driver_connection):
+    driver_connection.create_function(
+        "convert_value", 2, convert_value, deterministic=True
+    )
+
+
+@contextmanager
+def immediate_transaction(engine):
+    """
+    Runs statements, DDL included, in one BEGIN IMMEDIATE transaction. The
+    driver would otherwise commit before every DDL statement on its own.
+
+    Yields:
+        A connection; execute the statements with ``exec_driver_sql``.
+        Errors are raised as SQLAlchemy errors, so ``run_with_retry`` can
+        run the whole transaction again.
+    """
+    with engine.connect() as connection:
+        driver_connection = connection.connection.driver_connection
+        isolation_level = driver_connection.isolation_level
+        driver_connection.isolation_level = None
+        register_functions(driver_connection)
+        try:
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+            try:
+                yield connection
+                connection.exec_driver_sql("COMMIT")
+            except BaseException:
+                if driver_connection.in_transaction:
+                    driver_connection.rollback()
+                raise
+        finally:
+            connection.rollback()
+            driver_connection.isolation_level = isolation_level
+
+
+def get_conversion_expression(engine, column, data_type):
+    """
+    Returns the SQL expression converting a column to a schema data type
+    when a table is copied. Dates are rewritten in the ISO form SQLAlchemy
+    stores them in, with SQLite's date functions. Values that cannot be
+    converted become NULL.
+    """
+    quoted = quote_name(engine, column)
+    if data_type == "datetime":
+        # %f only has milliseconds; DateTime stores microseconds
+        return f"strftime('%Y-%m-%d %H:%M:%f', {quoted}) || '000'"
+    if data_type == "date":
+        return f"date({quoted})"
+    return f"convert_value({quoted}, '{data_type}')"
+
+
+def get_copy_names(table_name):
+    """
+    Returns the names of the new table, the change log table and the change
+    log triggers used while a table is copied.
+    """
+    return {
+        "table": f"{table_name}__rebuild",
+        "log": f"{table_name}__rebuild_log",
+        "triggers": [
+            f"{table_name}__rebuild_{action}"
+            for action in ("insert", "delete", "update")
+        ],
+    }
+
+
+def get_copy_statement(engine, table_name, new_table, column_expressions):
+    """
+    Returns the INSERT ... SELECT copying the rows of a table into its new
+    definition. Rowids are kept, so external content full-text indexes stay
+    valid.
+    """
+    columns = [column.name for column in new_table.columns]
+    column_list = ", ".join(quote_name(engine, column) for column in columns)
+    expressions = ", ".join(
+        column_expressions.get(column, quote_name(engine, column)) for column in columns
+    )
+    return (
+        f"INSERT INTO {quote_name(engine, new_table.name)} (rowid, {column_list}) "
+        f"SELECT rowid, {expressions} FROM {quote_name(engine, table_name)}"
+    )
+
+
+def drop_table_copy(connection, table_name):
+    """
+    Drops the new table, change log and triggers of an unfinished copy.
+    """
+    names = get_copy_names(table_name)
+    for trigger in names["triggers"]:
+        connection.exec_driver_sql(
+            f"DROP TRIGGER IF EXISTS {quote_name(connection, trigger)}"
+        )
+    for name in (names["table"], names["log"]):
+        connection.exec_driver_sql(
+            f"DROP TABLE IF EXISTS {quote_name(connection, name)}"
+        )
+
+
+def swap_table(connection, table_name, new_name, renames):
+    """
+    Replaces a table with its copy, following SQLite's documented procedure
+    for the changes ALTER TABLE cannot make: drop the old table, rename the
+    new one, then create the indexes and triggers again. Must run inside
+    ``immediate_transaction``.
+
+    Args:
+        connection: The connection of the transaction.
+        table_name: Name of the table to replace.
+        new_name: Name of the copy.
+        renames: Dict of {old column: new column}, applied to the indexes.
+    """
+    table = quote_name(connection, table_name)
+    indexes = []
+    for index_row in connection.exec_driver_sql(f"PRAGMA index_list({table})").all():
+        if index_row.origin != "c":
+            continue
+        column_rows = connection.exec_driver_sql(
+            f"PRAGMA index_info({quote_name(connection, index_row.name)})"
+        ).all()
+        columns = [
+            renames.get(row.name, row.name)
+            for row in sorted(column_rows, key=lambda row: row.seqno)
+        ]
+        indexes.append((index_row.name, columns, index_row.unique))
+    copy_triggers = get_copy_names(table_name)["triggers"]
+    trigger_rows = connection.exec_driver_sql(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = ?",
+        (table_name,),
+    ).all()
+
+    connection.exec_driver_sql(f"DROP TABLE {table}")
+    connection.exec_driver_sql(
+        f"ALTER TABLE {quote_name(connection, new_name)} RENAME TO {table}"
+    )
+    for index_name, columns, unique in indexes:
+        column_list = ", ".join(quote_name(connection, column) for column in columns)
+        connection.exec_driver_sql(
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX "
+            f"{quote_name(connection, index_name)} ON {table} ({column_list})"
+        )
+    for trigger_row in trigger_rows:
+        if trigger_row.name not in copy_triggers:
+            connection.exec_driver_sql(trigger_row.sql)
+
+
+def rebuild_table(engine, target_table, column_expressions, renames=None):
+    """
+    Rebuilds a table with a new definition in a single IMMEDIATE
+    transaction, for the changes ALTER TABLE cannot make in SQLite. Other
+    connections see either the old table or the new one, but writers wait
+    for the whole copy; see ``copy_table_online`` for tables in use.
+
+    Args:
+        engine: The database engine.
+        target_table: The SQLAlchemy Table with the new definition. Its
+            name is the name of the table to rebuild.
+        column_expressions: Dict of {new column: SQL expression over the old
+            columns}. Missing columns are copied by name.
+        renames: Optional dict of {old column: new column}, applied to the
+            indexes of the table.
+    """
+    table_name = target_table.name
+    new_name = get_copy_names(table_name)["table"]
+    new_table = target_table.to_metadata(MetaData(), name=new_name)
+    create_sql = str(CreateTable(new_table).compile(dialect=engine.dialect)).strip()
+    copy_sql = get_copy_statement(engine, table_name, new_table, column_expressions)
+
+    def run():
+        with immediate_transaction(engine) as connection:
+            drop_table_copy(connection, table_name)
+            connection.exec_driver_sql(create_sql)
+            connection.exec_driver_sql(copy_sql)
+            swap_table(connection, table_name, new_name, renames or {})
+
+    run_with_retry(run)
+
+
+def has_table_copy(engine, table_name):
+    """
+    Returns whether an interrupted ``copy_table_online`` left a copy of a
+    table behind.
+    """
+    with engine.connect() as connection:
+        row = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": get_copy_names(table_name)["table"]},
+        ).first()
+    return row is not None
+
+
+def cancel_table_copy(engine, table_name):
+    """
+    Discards an unfinished ``copy_table_online``. The table is untouched.
+    """
+
+    def run():
+        with immediate_transaction(engine) as connection:
+            drop_table_copy(connection, table_name)
+
+    run_with_retry(run)
+
+
+def copy_table_online(
+    engine,
+    target_table,
+    column_expressions,
+    renames=None,
+    batch_size=COPY_BATCH_SIZE,
+    progress=None,
+):
+    """
+    Rebuilds a table with a new definition while it stays in use.
+
+    The rows are copied into a new table in rowid order, ``batch_size`` rows
+    per short transaction, so readers and writers only ever wait for one
+    batch. Triggers log the rowids written in the part already copied; the
+    final transaction copies those rows again along with the rest, then
+    swaps the tables, see ``swap_table``.
+
+    The copy is resumable: the new table and the change log live in the
+    database, so after an interruption a copy to the same definition goes
+    on where it stopped. A copy to another definition starts over. A copy
+    that fails with a constraint error is discarded.
+
+    Args:
+        engine: The database engine.
+        target_table: The SQLAlchemy Table with the new definition. Its
+            name is the name of the table to rebuild.
+        column_expressions: Dict of {new column: SQL expression over the old
+            columns}. Missing columns are copied by name.
+        renames: Optional dict of {old column: new column}, applied to the
+            indexes of the table.
+        batch_size: Number of rows copied per transaction.
+        progress: Optional callable receiving the approximate share of the
+            rows copied so far.
+    """
+    table_name = target_table.name
+    names = get_copy_names(table_name)
+    new_table = target_table.to_metadata(MetaData(), name=names["table"])
+    create_sql = str(CreateTable(new_table).compile(dialect=engine.dialect)).strip()
+    copy_sql = get_copy_statement(engine, table_name, new_table, column_expressions)
+    table = quote_name(engine, table_name)
+    new = quote_name(engine, names["table"])
+    log = quote_name(engine, names["log"])
+
+    def start():
+        with immediate_transaction(engine) as connection:
+            existing_sql = connection.exec_driver_sql(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+                (names["table"],),
+            ).scalar()
+            if existing_sql == create_sql:
+                return
+            drop_table_copy(connection, table_name)
+            connection.exec_driver_sql(create_sql)
+            connection.exec_driver_sql(f"CREATE TABLE {log} (row INTEGER PRIMARY KEY)")
+            # Rows past the copied part need no log, the copy reaches them
+            copied = f"(SELECT MAX(rowid) FROM {new})"
+            for trigger, action, records in zip(
+                names["triggers"],
+                ("INSERT", "DELETE", "UPDATE"),
+                (["NEW"], ["OLD"], ["OLD", "NEW"]),
+            ):
+                statements = "".join(
+                    f"INSERT OR IGNORE INTO {log} (row) "
+                    f"SELECT {record}.rowid WHERE {record}.rowid <= {copied};\n"
+                    for record in records
+                )
+                connection.exec_driver_sql(
+                    f"CREATE TRIGGER {quote_name(engine, trigger)} "
+                    f"AFTER {action} ON {table}\nBEGIN\n{statements}END"
+                )
+
+    def copy_batch():
+        with immediate_transaction(engine) as connection:
+            last = connection.exec_driver_sql(f"SELECT MAX(rowid) FROM {new}").scalar()
+            if last is None:
+                copied = connection.exec_driver_sql(
+                    f"{copy_sql} ORDER BY rowid LIMIT ?", (batch_size,)
+                ).rowcount
+            else:
+                copied = connection.exec_driver_sql(
+                    f"{copy_sql} WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                    (last, batch_size),
+                ).rowcount
+            last = connection.exec_driver_sql(f"SELECT MAX(rowid) FROM {new}").scalar()
+            first, end = connection.exec_driver_sql(
+                f"SELECT MIN(rowid), MAX(rowid) FROM {table}"
+            ).one()
+        if last is None or first is None or end <= first:
+            return copied, 1.0
+        return copied, min((last - first) / (end - first), 1.0)
+
+    def finish():
+        with immediate_transaction(engine) as connection:
+            last = connection.exec_driver_sql(f"SELECT MAX(rowid) FROM {new}").scalar()
+            connection.exec_driver_sql(
+                f"DELETE FROM {new} WHERE rowid IN (SELECT row FROM {log})"
+            )
+            if last is None:
+                connection.exec_driver_sql(copy_sql)
+            else:
+                connection.exec_driver_sql(
+                    f"{copy_sql} WHERE rowid > ? OR rowid IN (SELECT row FROM {log})",
+                    (last,),
+                )
+            swap_table(connection, table_name, names["table"], renames or {})
+            connection.exec_driver_sql(f"DROP TABLE {log}")
+
+    try:
+        run_with_retry(start)
+        while True:
+            copied, fraction = run_with_retry(copy_batch)
+            if progress is not None:
+                progress(fraction)
+            if copied < batch_size:
+                break
+        run_with_retry(finish)
+    except IntegrityError:
+        # The rows do not fit the new definition, resuming cannot help
+        cancel_table_copy(engine, table_name)
+        raise
+
+
+def get_rowid_column(key_names, declared_types):
+    """
+    Returns the primary key column that is an alias of the rowid, which a
+    single INTEGER primary key is, or None.
+    """
+    if len(key_names) == 1 and declared_types[key_names[0]] == "INTEGER":
+        return key_names[0]
+    return None
+
+
+def plan_migration(engine, table_name, new_table, renames, old_index_names=()):
+    """
+    Compares an existing table with the table of a new schema and plans the
+    migration of its data.
+
+    Renamed, added and dropped columns only need ALTER TABLE. Changes to
+    types, the primary key or unique constraints need a copy of the table.
+    The copy runs in batches while the table stays in use when the rowids
+    can be kept, see ``copy_table_online``, and in a single transaction
+    when the new primary key becomes the rowid.
+
+    Args:
+        engine: The database engine.
+        table_name: Name of the existing table.
+        new_table: The SQLAlchemy Table of the new schema.
+        renames: Dict of {new column: old column} of the renamed columns.
+            Renames already applied are ignored.
+        old_index_names: Names of the indexes of the old schema. Those not
+            in the new schema are dropped; other indexes, such as the ones
+            added by hand, are kept as long as their columns are.
+
+    Returns:
+        A dict with renames ({old: new}), adds, drops, conversions ({column:
+        data type}), rebuild_reasons, online, drop_indexes, create_indexes
+        (tuples of name, columns, unique), drop_search_index and reset_stats.
+    """
+    with engine.connect() as connection:
+        rows = connection.execute(
+            text(f"PRAGMA table_info({quote_name(engine, table_name)})")
+        ).all()
+        search_columns = get_indexed_search_columns(
+            connection, get_search_table_name(table_name)
+        )
+    old_types = {row.name: row.type.upper() for row in rows}
+    old_keys = [row.name for row in sorted(rows, key=lambda row: row.pk) if row.pk]
+    new_types = {
+        column.name: column.type.compile(dialect=engine.dialect).upper()
+        for column in new_table.columns
+    }
+    new_keys = [column.name for column in new_table.primary_key.columns]
+
+    renamed = {
+        old: new
+        for new, old in renames.items()
+        if old in old_types and new not in old_types and new in new_types
+    }
+    sources = {new: old for old, new in renamed.items()}
+    adds = [
+        column
+        for column in new_types
+        if column not in old_types.keys() | sources.keys()
+    ]
+    drops = [
+        column
+        for column in old_types
+        if column not in new_types.keys() | renamed.keys()
+    ]
+    conversions = {
+        column: DATA_TYPES.get(new_types[column], "string")
+        for column in new_types
+        if column not in adds
+        and old_types[sources.get(column, column)] != new_types[column]
+    }
+
+    indexes = list_indexes(engine, table_name)
+    old_unique = {
+        frozenset(renamed.get(column, column) for column in index["columns"])
+        for index in indexes
+        if index["origin"] == "unique constraint"
+    }
+    new_unique = {
+        frozenset(column.name for column in constraint.columns)
+        for constraint in new_table.constraints
+        if isinstance(constraint, UniqueConstraint)
+    }
+    rebuild_reasons = []
+    if [renamed.get(column, column) for column in old_keys] != new_keys:
+        rebuild_reasons.append("the primary key changes")
+    if old_unique != new_unique:
+        rebuild_reasons.append("the unique constraints change")
+    for column, data_type in conversions.items():
+        rebuild_reasons.append(f"{column} changes to {data_type}")
+    if renamed and sqlite3.sqlite_version_info < (3, 25, 0):
+        rebuild_reasons.append(f"SQLite {sqlite3.sqlite_version} cannot rename")
+    if drops and sqlite3.sqlite_version_info < (3, 35, 0):
+        rebuild_reasons.append(f"SQLite {sqlite3.sqlite_version} cannot drop")
+
+    old_rowid = get_rowid_column(old_keys, old_types)
+    new_rowid = get_rowid_column(new_keys, new_types)
+    online = new_rowid is None or new_rowid == renamed.get(old_rowid, old_rowid)
+
+    new_indexes = {
+        index.name: ([column.name for column in index.columns], bool(index.unique))
+        for index in new_table.indexes
+    }
+    kept_indexes = set()
+    drop_indexes = []
+    for index in indexes:
+        if not index["droppable"]:
+            continue
+        columns = [renamed.get(column, column) for column in index["columns"]]
+        if (
+            any(column in drops for column in index["columns"])
+            or (
+                index["name"] in new_indexes
+                and new_indexes[index["name"]] != (columns, index["unique"])
+            )
+            or (index["name"] in old_index_names and index["name"] not in new_indexes)
+        ):
+            drop_indexes.append(index["name"])
+        else:
+            kept_indexes.add(index["name"])
+    create_indexes = [
+        (index_name, columns, unique)
+        for index_name, (columns, unique) in new_indexes.items()
+        if index_name not in kept_indexes
+    ]
+
+    # The full-text index and its triggers use the columns by name and the
+    # rows by rowid
+    changed = set(drops) | set(renamed) | {sources.get(c, c) for c in conversions}
+    drop_search = bool(search_columns) and (
+        bool(changed & set(search_columns)) or bool(rebuild_reasons and not online)
+    )
+    return {
+        "renames": renamed,
+        "adds": adds,
+        "drops": drops,
+        "conversions": conversions,
+        "rebuild_reasons": rebuild_reasons,
+        "online": online,
+        "drop_indexes": drop_indexes,
+        "create_indexes": create_indexes,
+        "drop_search_index": drop_search,
+        "reset_stats": bool(old_keys) and old_keys[0] != new_keys[0],
+    }
+
+
+def count_unconvertible_values(engine, table_name, plan):
+    """
+    Counts the non-empty values of the columns changing type that cannot be
+    converted and would become NULL.
+
+    Returns:
+        A dict of {column: count}.
+    """
+    if not plan["conversions"]:
+        return {}
+    sources = {new: old for old, new in plan["renames"].items()}
+    checks = []
+    for column, data_type in plan["conversions"].items():
+        source = sources.get(column, column)
+        quoted = quote_name(engine, source)
+        expression = get_conversion_expression(engine, source, data_type)
+        checks.append(
+            f"SUM(CASE WHEN {quoted} IS NOT NULL AND TRIM({quoted}) != '' "
+            f"AND {expression} IS NULL THEN 1 ELSE 0 END)"
+        )
+    statement = f"SELECT {', '.join(checks)} FROM {quote_name(engine, table_name)}"
+    with engine.connect() as connection:
+        register_functions(connection.connection.driver_connection)
+        counts = connection.exec_driver_sql(statement).one()
+    return {column: count or 0 for column, count in zip(plan["conversions"], counts)}
+
+
+def migrate_table(engine, new_table, plan, batch_size=COPY_BATCH_SIZE, progress=None):
+    """
+    Migrates an existing table to the table of a new schema, keeping its
+    data, following a plan from ``plan_migration``.
+
+    The full-text index and the stats triggers are dropped when the columns
+    they use change; ``ensure_search_index`` and ``ensure_table_stats``
+    create them again for the new model.
+
+    Args:
+        engine: The database engine.
+        new_table: The SQLAlchemy Table of the new schema.
+        plan: The migration plan.
+        batch_size: Number of rows copied per transaction, for a copy.
+        progress: Optional callable receiving the share of the rows copied.
+    """
+    table_name = new_table.name
+    table = quote_name(engine, table_name)
+    if plan["drop_search_index"]:
+        with engine.begin() as connection:
+            drop_search_index(connection, table_name)
+    if plan["reset_stats"]:
+        with engine.begin() as connection:
+            drop_stats_triggers(connection, table_name)
+    for index_name in plan["drop_indexes"]:
+        drop_index(engine, index_name)
+
+    if plan["rebuild_reasons"]:
+        sources = {new: old for old, new in plan["renames"].items()}
+        column_expressions = {}
+        for column in new_table.columns:
+            source = sources.get(column.name, column.name)
+            if column.name in plan["adds"]:
+                column_expressions[column.name] = "NULL"
+            elif column.name in plan["conversions"]:
+                column_expressions[column.name] = get_conversion_expression(
+                    engine, source, plan["conversions"][column.name]
+                )
+            elif source != column.name:
+                column_expressions[column.name] = quote_name(engine, source)
+        if plan["online"]:
+            copy_table_online(
+                engine,
+                new_table,
+                column_expressions,
+                plan["renames"],
+                batch_size,
+                progress,
+            )
+        else:
+            rebuild_table(engine, new_table, column_expressions, plan["renames"])
+    else:
+
+        def alter():
+            with immediate_transaction(engine) as connection:
+                for old, new in plan["renames"].items():
+                    connection.exec_driver_sql(
+                        f"ALTER TABLE {table} RENAME COLUMN "
+                        f"{quote_name(engine, old)} TO {quote_name(engine, new)}"
+                    )
+                for column in plan["drops"]:
+                    connection.exec_driver_sql(
+                        f"ALTER TABLE {table} DROP COLUMN {quote_name(engine, column)}"
+                    )
+                for column in plan["adds"]:
+                    declared_type = new_table.c[column].type.compile(
+                        dialect=engine.dialect
+                    )
+                    connection.exec_driver_sql(
+                        f"ALTER TABLE {table} ADD COLUMN "
+                        f"{quote_name(engine, column)} {declared_type}"
+                    )
+
+        run_with_retry(alter)
+
+    for index_name, columns, unique in plan["create_indexes"]:
+        create_index(engine, table_name, index_name, columns, unique)
+
+
+def migrate_text_dates(engine, table, column_types):
+    """
+    Converts text date columns to native date storage by rebuilding the
+    table. Values that cannot be read as dates become NULL, see
+    ``count_unreadable_dates``.
+
+    Args:
+        engine: The database engine.
+        table: The SQLAlchemy Table, with the text date columns.
+        column_types: Dict of {column: "date" or "datetime"} of the columns
+            to convert.
+    """
+    target_table = table.to_metadata(MetaData())
+    column_expressions = {}
+    for column, data_type in column_types.items():
+        target_table.c[column].type = DateTime() if data_type == "datetime" else Date()
+        column_expressions[column] = get_conversion_expression(
+            engine, column, data_type
+        )
+    rebuild_table(engine, target_table, column_expressions)
@@ -0,0 +1,314 @@
+import pyarrow as pa
+from sqlalchemy import and_, func, or_, select, true
+
+from tools.db_arrow import read_arrow_table
+from tools.db_filters import compile_filter
+
+
+def get_key_columns(model_class, key_names):
+    """
+    Resolves a list of column names to the columns of a model's table.
+
+    Args:
+        model_class: The SQLModel table class.
+        key_names: Names of the columns, usually the primary keys.
+
+    Returns:
+        A list of SQLAlchemy column objects in the given order.
+    """
+    table = model_class.__table__
+    return [table.c[key_name] for key_name in key_names]
+
+
+def get_order_terms(model_class, key_names, sort=None):
+    """
+    Returns the ordering of the records as a list of (expression,
+    descending) tuples.
+
+    Without a sort the records are ordered by the key columns. With a sort
+    they are ordered by the sort column and then the key columns in the
+    same direction, which makes the order total and lets SQLite walk an
+    index on the sort column in either direction. NULLs keep SQLite's own
+    order: they sort below every value, so they come first ascending and
+    last descending.
+
+    Args:
+        model_class: The SQLModel table class.
+        key_names: Names of the key columns.
+        sort: Optional tuple of (column name, descending).
+    """
+    key_columns = get_key_columns(model_class, key_names)
+    if sort is None:
+        return [(column, False) for column in key_columns]
+    sort_name, descending = sort
+    sort_column = model_class.__table__.c[sort_name]
+    return [(column, descending) for column in [sort_column] + key_columns]
+
+
+def order_by_terms(order_terms, reverse=False):
+    return [
+        expression.desc() if descending != reverse else expression.asc()
+        for expression, descending in order_terms
+    ]
+
+
+def keyset_condition(order_terms, key, forward=True):
+    """
+    Builds the WHERE clause selecting the rows strictly after (or before)
+    the given key in the ordering of ``order_terms``.
+
+    The comparison is expanded into its lexicographic form,
+    ``(a > x) OR (a = x AND b > y) ...``, so composite keys work on every
+    SQLite version. NULL is taken as lower than every value, as in SQLite's
+    ORDER BY, except that ``a < x`` leaves out NULLs: see
+    ``keyset_segments``, which also adds the bound SQLite needs to search
+    an index for the expansion.
+
+    Args:
+        order_terms: The ordering, see ``get_order_terms``.
+        key: The key values, one per term.
+        forward: True for rows after the key, False for rows before it.
+
+    Returns:
+        A SQLAlchemy boolean expression.
+    """
+    clauses = []
+    for index, (expression, descending) in enumerate(order_terms):
+        equal_prefix = [
+            (
+                order_terms[i][0].is_(None)
+                if key[i] is None
+                else order_terms[i][0] == key[i]
+            )
+            for i in range(index)
+        ]
+        if forward != descending:
+            if key[index] is None:
+                comparison = expression.is_not(None)
+            else:
+                comparison = expression > key[index]
+        elif key[index] is None:
+            # Nothing sorts below NULL
+            continue
+        else:
+            comparison = expression < key[index]
+        clauses.append(and_(*equal_prefix, comparison))
+    return or_(*clauses)
+
+
+def keyset_segments(order_terms, key, forward=True):
+    """
+    Splits the rows strictly after (or before) the given key into
+    conditions that SQLite can each answer with an index range search on
+    the first ordering term. Read one after the other, in the same order,
+    they give the rows in the order of ``order_terms``.
+
+    The first segment is ``keyset_condition`` AND-ed with the bound
+    ``a >= x`` (or ``a <= x`` when walking down the order), so the search
+    starts at the key instead of at the start of the index. NULLs of the
+    first term sort below every value, so when walking down from a value
+    they are a trailing segment of their own; when the key itself is NULL,
+    the rows with a value follow its segment when walking up.
+
+    Args:
+        order_terms: The ordering, see ``get_order_terms``.
+        key: The key values, one per term.
+        forward: True for rows after the key, False for rows before it.
+
+    Returns:
+        A list of SQLAlchemy boolean expressions.
+    """
+    expression, descending = order_terms[0]
+    upward = forward != descending
+    if key[0] is None:
+        ties = and_(
+            expression.is_(None),
+            keyset_condition(order_terms[1:], key[1:], forward),
+        )
+        return [ties, expression.is_not(None)] if upward else [ties]
+
+    if upward:
+        return [and_(expression >= key[0], keyset_condition(order_terms, key, forward))]
+    segments = [and_(expression <= key[0], keyset_condition(order_terms, key, forward))]
+    if expression.nullable:
+        segments.append(expression.is_(None))
+    return segments
+
+
+def row_key(row, key_names, sort=None):
+    """
+    Returns the key of a row in the ordering of ``get_order_terms`` as a
+    list, which is safe to keep in session state.
+    """
+    key = [row[key_name] for key_name in key_names]
+    if sort is None:
+        return key
+    return [row[sort[0]]] + key
+
+
+def fetch_page(
+    engine, model_class, key_names, page_size, after_key=None, conditions=(), sort=None
+):
+    """
+    Fetches one page of records using keyset pagination on the given key.
+
+    Only ``page_size + 1`` rows are read; the extra row tells whether a
+    next page exists and is not returned. The rows are read with a Core
+    SELECT straight into Arrow columns, without building a model instance
+    or a dict per row.
+
+    Args:
+        engine: The database engine.
+        model_class: The SQLModel table class.
+        key_names: Names of the key columns the pages are ordered by.
+        page_size: Number of records per page.
+        after_key: Key of the last record of the previous page, or None
+            for the first page.
+        conditions: Optional filter conditions, see ``tools.db_filters``.
+        sort: Optional tuple of (column name, descending).
+
+    Returns:
+        A tuple of (page, has_next) where page is a pyarrow.Table.
+    """
+    order_terms = get_order_terms(model_class, key_names, sort)
+    statement = select(model_class.__table__).where(*conditions)
+    statement = statement.order_by(*order_by_terms(order_terms))
+    if after_key is None:
+        segments = [true()]
+    else:
+        segments = keyset_segments(order_terms, after_key)
+
+    tables = []
+    rows_read = 0
+    for segment in segments:
+        table = read_arrow_table(
+            engine, statement.where(segment).limit(page_size + 1 - rows_read)
+        )
+        tables.append(table)
+        rows_read += table.num_rows
+        if rows_read > page_size:
+            break
+    page = pa.concat_tables(tables)
+    has_next = page.num_rows > page_size
+    return page.slice(0, page_size), has_next
+
+
+def find_previous_page_key(
+    engine, model_class, key_names, page_size, first_key, conditions=(), sort=None
+):
+    """
+    Finds the ``after_key`` of the page preceding the page starting at
+    ``first_key``.
+
+    Returns:
+        The key to pass to ``fetch_page``, or None when the previous page
+        is the first page.
+    """
+    order_terms = get_order_terms(model_class, key_names, sort)
+    statement = (
+        select(*[expression for expression, _ in order_terms])
+        .where(*conditions)
+        .order_by(*order_by_terms(order_terms, reverse=True))
+    )
+    keys = []
+    with engine.connect() as connection:
+        for segment in keyset_segments(order_terms, first_key, forward=False):
+            keys += connection.execute(
+                statement.where(segment).limit(page_size + 1 - len(keys))
+            ).all()
+            if len(keys) > page_size:
+                break
+
+    if len(keys) <= page_size:
+        return None
+    return list(keys[page_size])
+
+
+def find_page_key(
+    engine, model_class, key_names, page_size, page_number, conditions=(), sort=None
+):
+    """
+    Finds the ``after_key`` for jumping directly to ``page_number``.
+
+    Only the ordering columns are read, so SQLite can walk an index rather
+    than the table.
+
+    Returns:
+        A tuple of (found, after_key). ``found`` is False when the page
+        does not exist.
+    """
+    if page_number <= 1:
+        return True, None
+
+    order_terms = get_order_terms(model_class, key_names, sort)
+    statement = (
+        select(*[expression for expression, _ in order_terms])
+        .where(*conditions)
+        .order_by(*order_by_terms(order_terms))
+        .offset((page_number - 1) * page_size - 1)
+        .limit(2)
+    )
+    with engine.connect() as connection:
+        keys = connection.execute(statement).all()
+
+    # The page exists only if there is a row after its boundary key
+    if len(keys) < 2:
+        return False, None
+    return True, list(keys[0])
+
+
+def count_rows(engine, model_class, conditions=()):
+    """
+    Counts the records matching the filter conditions.
+    """
+    statement = select(func.count()).select_from(model_class.__table__)
+    statement = statement.where(*conditions)
+    with engine.connect() as connection:
+        return connection.execute(statement).scalar_one()
+
+
+def find_keys(engine, model_class, key_names, start_values, limit, after_key=None):
+    """
+    Finds the keys of the records at or after the given key values, in key
+    order, for looking up a record without listing every key.
+
+    Values are used up to the first empty one. The last value given is a
+    lower bound (or a prefix, for text); the ones before it must match
+    exactly. Only the key columns are read, from the primary key index.
+
+    Args:
+        engine: The database engine.
+        model_class: The SQLModel table class.
+        key_names: Names of the key columns.
+        start_values: One value or None per key column.
+        limit: Maximum number of keys to return.
+        after_key: Last key of the previous batch, to page through matches.
+
+    Returns:
+        A tuple of (keys, has_more) where keys is a list of tuples.
+    """
+    key_columns = get_key_columns(model_class, key_names)
+    given = []
+    for column, value in zip(key_columns, start_values):
+        if value is None:
+            break
+        given.append((column, value))
+
+    conditions = [column == value for column, value in given[:-1]]
+    if given:
+        column, value = given[-1]
+        if isinstance(value, str):
+            conditions += compile_filter(column, "starts with", value)
+        else:
+            conditions.append(column >= value)
+    if after_key is not None:
+        order_terms = [(column, False) for column in key_columns]
+        # Key columns are never NULL, so there is a single segment
+        conditions += keyset_segments(order_terms, after_key)
+
+    statement = (
+        select(*key_columns).where(*conditions).order_by(*key_columns).limit(limit + 1)
+    )
+    with engine.connect() as connection:
+        keys = [tuple(row) for row in connection.execute(statement).all()]
+    return keys[:limit], len(keys) > limit
@@ -0,0 +1,183 @@
+import time
+
+from sqlalchemy import text
+
+from tools.db_engine import run_with_retry
+from tools.db_stats import quote_name
+
+SEARCH_RESULT_LIMIT = 50
+
+
+def get_search_table_name(table_name):
+    return f"{table_name}_fts"
+
+
+def get_search_columns(model_class):
+    """
+    Returns the columns of a model that are marked as searchable, through
+    ``info={"searchable": True}`` on the column.
+    """
+    return [
+        column.name
+        for column in model_class.__table__.columns
+        if column.info.get("searchable")
+    ]
+
+
+def get_indexed_search_columns(connection, search_table):
+    """
+    Returns the columns of an existing full-text index, or None if there is
+    no index.
+    """
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": search_table},
+    ).first()
+    if exists is None:
+        return None
+    rows = connection.execute(
+        text(f"PRAGMA table_info({quote_name(connection, search_table)})")
+    ).all()
+    return [row.name for row in rows]
+
+
+def ensure_search_index(engine, model_class):
+    """
+    Creates the FTS5 index of the searchable columns of a table and the
+    triggers that keep it in sync with every write.
+
+    The index is an external content table: it stores only the search index
+    and reads the text from the table itself, keyed by rowid. A new index is
+    filled from the rows already in the table. If the searchable columns
+    changed, the index is rebuilt; if there are none, it is dropped.
+
+    Args:
+        engine: The database engine.
+        model_class: The SQLModel table class.
+    """
+    table_name = model_class.__tablename__
+    search_table = get_search_table_name(table_name)
+    columns = get_search_columns(model_class)
+
+    table = quote_name(engine, table_name)
+    fts = quote_name(engine, search_table)
+    column_list = ", ".join(quote_name(engine, column) for column in columns)
+    new_values = ", ".join(f"NEW.{quote_name(engine, c)}" for c in columns)
+    old_values = ", ".join(f"OLD.{quote_name(engine, c)}" for c in columns)
+
+    with engine.begin() as connection:
+        indexed_columns = get_indexed_search_columns(connection, search_table)
+        if indexed_columns == columns:
+            return
+        if indexed_columns is not None:
+            drop_search_index(connection, table_name)
+        if not columns:
+            return
+
+        statements = [
+            f"""
+            CREATE VIRTUAL TABLE {fts} USING fts5(
+                {column_list}, content={table}, content_rowid='rowid'
+            )
+            """,
+            f"""
+            CREATE TRIGGER "{table_name}_search_insert" AFTER INSERT ON {table}
+            BEGIN
+                INSERT INTO {fts}(rowid, {column_list})
+                VALUES (NEW.rowid, {new_values});
+            END
+            """,
+            f"""
+            CREATE TRIGGER "{table_name}_search_delete" AFTER DELETE ON {table}
+            BEGIN
+                INSERT INTO {fts}({fts}, rowid, {column_list})
+                VALUES ('delete', OLD.rowid, {old_values});
+            END
+            """,
+            f"""
+            CREATE TRIGGER "{table_name}_search_update" AFTER UPDATE ON {table}
+            BEGIN
+                INSERT INTO {fts}({fts}, rowid, {column_list})
+                VALUES ('delete', OLD.rowid, {old_values});
+                INSERT INTO {fts}(rowid, {column_list})
+                VALUES (NEW.rowid, {new_values});
+            END
+            """,
+            f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+        ]
+        for statement in statements:
+            connection.execute(text(statement))
+
+
+def drop_search_index(connection, table_name):
+    for action in ("insert", "delete", "update"):
+        connection.execute(
+            text(f'DROP TRIGGER IF EXISTS "{table_name}_search_{action}"')
+        )
+    search_table = quote_name(connection, get_search_table_name(table_name))
+    connection.execute(text(f"DROP TABLE IF EXISTS {search_table}"))
+
+
+def rebuild_search_index(engine, model_class):
+    """
+    Rebuilds the full-text index from the table, e.g. after a VACUUM, which
+    may renumber the rowids of tables without an INTEGER PRIMARY KEY.
+    """
+    fts = quote_name(engine, get_search_table_name(model_class.__tablename__))
+
+    def run():
+        with engine.begin() as connection:
+            connection.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+
+    run_with_retry(run)
+
+
+def to_match_query(search_text):
+    """
+    Turns free text into an FTS5 query. Every word is quoted, so FTS5
+    syntax in the text cannot cause errors, and matched as a prefix. All
+    words must match.
+    """
+    terms = []
+    for word in search_text.split():
+        terms.append('"' + word.replace('"', '""') + '"*')
+    return " ".join(terms)
+
+
+def search_records(engine, model_class, search_text, limit=SEARCH_RESULT_LIMIT):
+    """
+    Finds the records matching a full-text search, best matches first.
+
+    Args:
+        engine: The database engine.
+        model_class: The SQLModel table class.
+        search_text: The words to search for.
+        limit: Maximum number of records to return.
+
+    Returns:
+        A dict with rows (a list of dicts with a "rank" key, lower is
+        better) and seconds.
+    """
+    match_query = to_match_query(search_text)
+    if not match_query:
+        return {"rows": [], "seconds": 0.0}
+
+    table_name = model_class.__tablename__
+    table = quote_name(engine, table_name)
+    fts = quote_name(engine, get_search_table_name(table_name))
+    statement = text(
+        f"""
+        SELECT {table}.*, bm25({fts}) AS rank
+        FROM {fts} JOIN {table} ON {table}.rowid = {fts}.rowid
+        WHERE {fts} MATCH :match_query
+        ORDER BY rank
+        LIMIT :limit
+        """
+    )
+    started = time.perf_counter()
+    with engine.connect() as connection:
+        result = connection.execute(
+            statement, {"match_query": match_query, "limit": limit}
+        )
+        rows = [dict(row._mapping) for row in result]
+    return {"rows": rows, "seconds": time.perf_counter() - started}
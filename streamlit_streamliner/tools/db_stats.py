@@ -0,0 +1,178 @@
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+STATS_TABLE = "_table_stats"
+
+
+def quote_name(engine, name):
+    """
+    Quotes a table or column name for use in raw SQL.
+    """
+    return engine.dialect.identifier_preparer.quote(name)
+
+
+def get_stats_key_name(model_class):
+    """
+    Returns the column the min/max statistics are kept for: the leading
+    primary key column, which is always covered by the primary key index.
+    """
+    return list(model_class.__table__.primary_key.columns)[0].name
+
+
+def ensure_table_stats(engine, model_class):
+    """
+    Creates the stats table and the triggers that keep it up to date for the
+    table of ``model_class``. Existing tables are counted once when their
+    stats row is first created.
+
+    The triggers fire for every write, so the stats stay correct no matter
+    which code path (or which process) changes the table.
+
+    Args:
+        engine: The database engine.
+        model_class: The SQLModel table class.
+    """
+    table_name = model_class.__tablename__
+    table = quote_name(engine, table_name)
+    key = quote_name(engine, get_stats_key_name(model_class))
+    where_table = f"WHERE table_name = '{table_name}'"
+
+    statements = [
+        f"""
+        CREATE TABLE IF NOT EXISTS {STATS_TABLE} (
+            table_name TEXT PRIMARY KEY,
+            row_count INTEGER NOT NULL DEFAULT 0,
+            last_modified TEXT,
+            min_pk,
+            max_pk,
+            change_count INTEGER NOT NULL DEFAULT 0
+        )
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS "{table_name}_stats_insert"
+        AFTER INSERT ON {table}
+        BEGIN
+            UPDATE {STATS_TABLE} SET
+                row_count = row_count + 1,
+                last_modified = CURRENT_TIMESTAMP,
+                min_pk = CASE WHEN min_pk IS NULL OR NEW.{key} < min_pk
+                    THEN NEW.{key} ELSE min_pk END,
+                max_pk = CASE WHEN max_pk IS NULL OR NEW.{key} > max_pk
+                    THEN NEW.{key} ELSE max_pk END,
+                change_count = change_count + 1
+            {where_table};
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS "{table_name}_stats_delete"
+        AFTER DELETE ON {table}
+        BEGIN
+            UPDATE {STATS_TABLE} SET
+                row_count = row_count - 1,
+                last_modified = CURRENT_TIMESTAMP,
+                min_pk = CASE WHEN OLD.{key} = min_pk
+                    THEN (SELECT MIN({key}) FROM {table}) ELSE min_pk END,
+                max_pk = CASE WHEN OLD.{key} = max_pk
+                    THEN (SELECT MAX({key}) FROM {table}) ELSE max_pk END,
+                change_count = change_count + 1
+            {where_table};
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS "{table_name}_stats_update"
+        AFTER UPDATE ON {table}
+        BEGIN
+            UPDATE {STATS_TABLE} SET
+                last_modified = CURRENT_TIMESTAMP,
+                min_pk = CASE WHEN OLD.{key} IS NOT NEW.{key}
+                    THEN (SELECT MIN({key}) FROM {table}) ELSE min_pk END,
+                max_pk = CASE WHEN OLD.{key} IS NOT NEW.{key}
+                    THEN (SELECT MAX({key}) FROM {table}) ELSE max_pk END,
+                change_count = change_count + 1
+            {where_table};
+        END
+        """,
+    ]
+    with engine.begin() as connection:
+        for statement in statements:
+            connection.execute(text(statement))
+        exists = connection.execute(
+            text(f"SELECT 1 FROM {STATS_TABLE} {where_table}")
+        ).first()
+        if not exists:
+            # One-time scan to seed the stats of a table created before them
+            connection.execute(
+                text(
+                    f"""
+                    INSERT INTO {STATS_TABLE}
+                        (table_name, row_count, last_modified, min_pk, max_pk)
+                    SELECT '{table_name}', COUNT(*), CURRENT_TIMESTAMP,
+                        MIN({key}), MAX({key})
+                    FROM {table}
+                    """
+                )
+            )
+
+
+def drop_stats_triggers(connection, table_name):
+    """
+    Drops the stats triggers of a table, e.g. before its primary key
+    changes. ``ensure_table_stats`` creates them again.
+    """
+    for action in ("insert", "delete", "update"):
+        connection.execute(
+            text(f'DROP TRIGGER IF EXISTS "{table_name}_stats_{action}"')
+        )
+
+
+def refresh_table_stats(engine, model_class):
+    """
+    Recounts the table and rewrites its stats row. Only needed to repair the
+    stats after the table was changed with the triggers bypassed.
+    """
+    table_name = model_class.__tablename__
+    table = quote_name(engine, table_name)
+    key = quote_name(engine, get_stats_key_name(model_class))
+    ensure_table_stats(engine, model_class)
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                f"""
+                UPDATE {STATS_TABLE} SET
+                    row_count = (SELECT COUNT(*) FROM {table}),
+                    min_pk = (SELECT MIN({key}) FROM {table}),
+                    max_pk = (SELECT MAX({key}) FROM {table}),
+                    change_count = change_count + 1
+                WHERE table_name = :table_name
+                """
+            ),
+            {"table_name": table_name},
+        )
+
+
+def get_table_stats(engine, model_class):
+    """
+    Reads the stats of the table of ``model_class`` with a single primary key
+    lookup, creating the stats table first if needed.
+
+    Returns:
+        A dict with row_count, last_modified, min_pk, max_pk and change_count.
+    """
+    table_name = model_class.__tablename__
+    query = text(
+        f"""
+        SELECT row_count, last_modified, min_pk, max_pk, change_count
+        FROM {STATS_TABLE} WHERE table_name = :table_name
+        """
+    )
+    try:
+        with engine.connect() as connection:
+            row = connection.execute(query, {"table_name": table_name}).first()
+    except OperationalError:
+        # The stats table does not exist yet
+        row = None
+    if row is None:
+        ensure_table_stats(engine, model_class)
+        with engine.connect() as connection:
+            row = connection.execute(query, {"table_name": table_name}).first()
+    return dict(row._mapping)
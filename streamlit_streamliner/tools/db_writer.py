@@ -0,0 +1,234 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import streamlit as st
+
+from tools.db_engine import get_registry_key, run_with_retry
+from tools.db_migrate import immediate_transaction
+
+# Longest time a write waits in the queue for others to share its commit
+GROUP_COMMIT_WINDOW = 0.01
+
+# Most writes committed in one transaction
+GROUP_COMMIT_MAX_WRITES = 200
+
+# Longest time a session waits for the result of a queued write, in seconds
+WRITE_TIMEOUT = 30
+
+
+class DatabaseWriter:
+    """
+    A thread applying the queued writes of one database. The writes that
+    arrive within GROUP_COMMIT_WINDOW of the first one share its transaction,
+    so they take the write lock and sync the file once instead of each on
+    their own. Every write runs in its own savepoint, so a failing write is
+    rolled back alone and only its own caller sees the error.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.writes = 0
+        self.commits = 0
+        self.failed = 0
+        self.largest_commit = 0
+        self.thread = threading.Thread(
+            target=self.run,
+            name=f"writer-{os.path.basename(engine.url.database)}",
+            daemon=True,
+        )
+        self.thread.start()
+
+    def submit(self, operation):
+        """
+        Queues a write.
+
+        Args:
+            operation: A callable receiving a connection inside the
+                transaction. It runs in the writer thread and must return a
+                plain value, such as a row count, not a result object.
+
+        Returns:
+            A Future holding the return value of ``operation``, or its error.
+        """
+        future = Future()
+        self.queue.put((operation, future))
+        return future
+
+    def stop(self, timeout=None):
+        """
+        Commits the writes already queued, then ends the thread.
+        """
+        self.queue.put(None)
+        self.thread.join(timeout)
+
+    def next_batch(self):
+        """
+        Waits for a write, then collects the writes that arrive within the
+        group commit window.
+
+        Returns:
+            A tuple of (batch, stopping).
+        """
+        item = self.queue.get()
+        if item is None:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + GROUP_COMMIT_WINDOW
+        while len(batch) < GROUP_COMMIT_MAX_WRITES:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def commit(self, batch):
+        def apply():
+            outcomes = []
+            with immediate_transaction(self.engine) as connection:
+                for operation, _ in batch:
+                    savepoint = connection.begin_nested()
+                    try:
+                        result = operation(connection)
+                    except Exception as e:
+                        savepoint.rollback()
+                        outcomes.append((None, e))
+                    else:
+                        savepoint.commit()
+                        outcomes.append((result, None))
+            return outcomes
+
+        try:
+            outcomes = run_with_retry(apply)
+        except Exception as e:
+            # Nothing of the batch was committed
+            with self.lock:
+                self.failed += len(batch)
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        with self.lock:
+            self.writes += len(batch)
+            self.commits += 1
+            self.largest_commit = max(self.largest_commit, len(batch))
+        for (_, future), (result, error) in zip(batch, outcomes):
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+    def run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = self.next_batch()
+            if batch:
+                self.commit(batch)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "writes": self.writes,
+                "commits": self.commits,
+                "writes_per_commit": (
+                    self.writes / self.commits if self.commits else 0.0
+                ),
+                "largest_commit": self.largest_commit,
+                "failed": self.failed,
+                "queued": self.queue.qsize(),
+            }
+
+
+@st.cache_resource
+def get_writer_registry():
+    """
+    Returns the process-wide registry of database writers and of the
+    databases using group commit, shared by all sessions.
+    """
+    return {"writers": {}, "enabled": set(), "lock": threading.Lock()}
+
+
+def is_group_commit_enabled(engine):
+    key = get_registry_key(engine.url.database)
+    return key in get_writer_registry()["enabled"]
+
+
+def set_group_commit(engine, enabled):
+    """
+    Turns group commit on or off for a database, for every session. While
+    it is off, writes commit one by one as usual.
+    """
+    registry = get_writer_registry()
+    key = get_registry_key(engine.url.database)
+    with registry["lock"]:
+        if enabled:
+            registry["enabled"].add(key)
+        else:
+            registry["enabled"].discard(key)
+
+
+def get_writer(engine):
+    """
+    Returns the writer of a database, starting its thread on first use.
+    """
+    registry = get_writer_registry()
+    key = get_registry_key(engine.url.database)
+    writer = registry["writers"].get(key)
+    if writer is not None:
+        return writer
+    with registry["lock"]:
+        if key not in registry["writers"]:
+            registry["writers"][key] = DatabaseWriter(engine)
+        return registry["writers"][key]
+
+
+def run_grouped_write(engine, operation, timeout=WRITE_TIMEOUT):
+    """
+    Runs a write through the writer of its database and waits until it is
+    committed.
+
+    Args:
+        engine: The database engine.
+        operation: A callable receiving a connection, see
+            ``DatabaseWriter.submit``.
+        timeout: Seconds to wait for the commit.
+
+    Returns:
+        The return value of ``operation``. Its error is raised instead if it
+        failed or if the transaction could not be committed.
+    """
+    return get_writer(engine).submit(operation).result(timeout)
+
+
+def stop_writer(db_file):
+    """
+    Commits the queued writes of a database file and ends its writer. Must
+    be called before the file is deleted or renamed.
+    """
+    registry = get_writer_registry()
+    key = get_registry_key(db_file)
+    with registry["lock"]:
+        writer = registry["writers"].pop(key, None)
+        registry["enabled"].discard(key)
+    if writer is not None:
+        writer.stop(WRITE_TIMEOUT)
+
+
+def get_writer_stats(engine):
+    """
+    Returns the counters of the writer of a database, or None if it has not
+    been started.
+    """
+    key = get_registry_key(engine.url.database)
+    writer = get_writer_registry()["writers"].get(key)
+    return writer.stats() if writer is not None else None
@@ -0,0 +1,126 @@
+import os
+import tempfile
+import time
+
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from sqlalchemy import select
+
+from tools.db_arrow import get_arrow_schema, iter_arrow_batches
+from tools.db_queries import get_key_columns
+
+EXPORT_FORMATS = {
+    "CSV": {"extension": "csv", "mime": "text/csv"},
+    "Parquet": {"extension": "parquet", "mime": "application/octet-stream"},
+}
+EXPORT_CHUNK_SIZE = 50000
+EXPORTS_DIR = "exports"
+
+# Exports and rejected-row files older than this many seconds are removed,
+# since the session that made them may be long gone
+EXPORT_MAX_AGE = 24 * 60 * 60
+
+
+def remove_old_exports(max_age=EXPORT_MAX_AGE):
+    """
+    Removes the files in EXPORTS_DIR that were last written more than
+    ``max_age`` seconds ago.
+
+    Returns:
+        The number of files removed.
+    """
+    if not os.path.exists(EXPORTS_DIR):
+        return 0
+    oldest = time.time() - max_age
+    removed = 0
+    for file_name in os.listdir(EXPORTS_DIR):
+        path = os.path.join(EXPORTS_DIR, file_name)
+        try:
+            if os.path.isfile(path) and os.path.getmtime(path) < oldest:
+                os.remove(path)
+                removed += 1
+        except FileNotFoundError:
+            # Removed by another session in the meantime
+            pass
+    return removed
+
+
+def iter_table_batches(engine, model_class, key_names, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Reads a table in primary key order and yields it as Arrow record
+    batches of at most ``chunk_size`` rows, see
+    ``tools.db_arrow.iter_arrow_batches``.
+
+    Args:
+        engine: The database engine.
+        model_class: The SQLModel table class.
+        key_names: Primary key columns, used for the order.
+        chunk_size: Number of rows per batch.
+
+    Yields:
+        pyarrow.RecordBatch objects.
+    """
+    table = model_class.__table__
+    statement = select(table).order_by(*get_key_columns(model_class, key_names))
+    return iter_arrow_batches(engine, statement, chunk_size)
+
+
+def export_table(
+    engine,
+    model_class,
+    key_names,
+    export_format,
+    chunk_size=EXPORT_CHUNK_SIZE,
+    total_rows=None,
+    progress=None,
+):
+    """
+    Writes a table to a CSV or Parquet file one batch at a time, so the
+    table never has to fit in memory.
+
+    Args:
+        engine: The database engine.
+        model_class: The SQLModel table class.
+        key_names: Primary key columns, used for the order.
+        export_format: A key of EXPORT_FORMATS.
+        chunk_size: Number of rows per batch.
+        total_rows: Number of rows expected, used for the progress fraction.
+        progress: Optional callable receiving (rows written, fraction).
+
+    Returns:
+        A summary dict with path, rows and seconds.
+    """
+    if not os.path.exists(EXPORTS_DIR):
+        os.makedirs(EXPORTS_DIR)
+    extension = EXPORT_FORMATS[export_format]["extension"]
+    file_descriptor, path = tempfile.mkstemp(
+        prefix=f"{model_class.__tablename__}_", suffix=f".{extension}", dir=EXPORTS_DIR
+    )
+    os.close(file_descriptor)
+
+    schema = get_arrow_schema(model_class.__table__.columns)
+    if export_format == "CSV":
+        writer = pa_csv.CSVWriter(path, schema)
+    else:
+        writer = pq.ParquetWriter(path, schema)
+
+    rows_written = 0
+    started = time.perf_counter()
+    try:
+        for batch in iter_table_batches(engine, model_class, key_names, chunk_size):
+            writer.write_batch(batch)
+            rows_written += batch.num_rows
+            if progress is not None:
+                fraction = min(rows_written / total_rows, 1.0) if total_rows else None
+                progress(rows_written, fraction)
+    except Exception:
+        writer.close()
+        os.remove(path)
+        raise
+    writer.close()
+
+    return {
+        "path": path,
+        "rows": rows_written,
+        "seconds": time.perf_counter() - started,
+    }
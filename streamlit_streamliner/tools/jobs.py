@@ -0,0 +1,253 @@
+import datetime
+import json
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+from sqlalchemy import select
+
+from tools.catalog import get_catalog_engine, jobs_table
+from tools.db_engine import run_with_retry
+from tools.export import remove_old_exports
+
+# Number of jobs run at the same time in the process
+JOB_WORKERS = 2
+
+# Progress is written to the catalog at most this often, in seconds
+JOB_PROGRESS_INTERVAL = 0.5
+
+# Number of jobs of a database listed by default, newest first
+JOB_HISTORY_LIMIT = 20
+
+ACTIVE_JOB_STATUSES = ("queued", "running")
+
+JOB_THREAD_PREFIX = "job"
+
+
+class JobThreadFilter(logging.Filter):
+    """
+    Drops the "missing ScriptRunContext" warnings of the job threads. Jobs
+    only use the shared ``st.cache_resource`` registries, which work outside
+    a script run, and never draw elements.
+    """
+
+    def filter(self, record):
+        return not threading.current_thread().name.startswith(JOB_THREAD_PREFIX)
+
+
+@st.cache_resource
+def get_job_runner():
+    """
+    Returns the process-wide job runner, shared by all sessions.
+
+    Jobs that were queued or running when the previous process stopped can
+    never finish, so they are marked as interrupted, and the old files their
+    sessions left in the exports folder are removed.
+    """
+    engine = get_catalog_engine()
+    with engine.begin() as connection:
+        connection.execute(
+            jobs_table.update()
+            .where(jobs_table.c.status.in_(ACTIVE_JOB_STATUSES))
+            .values(
+                status="interrupted",
+                error="The app stopped before the job finished.",
+                finished_at=datetime.datetime.now(),
+            )
+        )
+    remove_old_exports()
+    logging.getLogger(
+        "streamlit.runtime.scriptrunner_utils.script_run_context"
+    ).addFilter(JobThreadFilter())
+    return {
+        "executor": ThreadPoolExecutor(
+            max_workers=JOB_WORKERS, thread_name_prefix=JOB_THREAD_PREFIX
+        ),
+        "engine": engine,
+        # Jobs waiting for the running job of their database, by database
+        "pending": {},
+        "busy_dbs": set(),
+        "lock": threading.Lock(),
+    }
+
+
+def start_job(runner, job_id, db_name, work):
+    future = runner["executor"].submit(run_job, runner, job_id, work)
+    future.add_done_callback(lambda _: start_next_job(runner, db_name))
+
+
+def start_next_job(runner, db_name):
+    """
+    Starts the next pending job of a database once its running job has
+    ended, or marks the database as free if none is pending.
+    """
+    with runner["lock"]:
+        pending = runner["pending"].get(db_name)
+        if not pending:
+            runner["pending"].pop(db_name, None)
+            runner["busy_dbs"].discard(db_name)
+            return
+        job_id, work = pending.popleft()
+    start_job(runner, job_id, db_name, work)
+
+
+def update_job(engine, job_id, **values):
+    def run():
+        with engine.begin() as connection:
+            connection.execute(
+                jobs_table.update().where(jobs_table.c.id == job_id).values(**values)
+            )
+
+    run_with_retry(run)
+
+
+def run_job(runner, job_id, work):
+    engine = runner["engine"]
+    update_job(
+        engine,
+        job_id,
+        status="running",
+        progress=0.0,
+        started_at=datetime.datetime.now(),
+    )
+    last_report = [0.0]
+
+    def report(fraction=None, message=None):
+        now = time.monotonic()
+        if now - last_report[0] < JOB_PROGRESS_INTERVAL:
+            return
+        last_report[0] = now
+        values = {"message": message}
+        if fraction is not None:
+            values["progress"] = min(fraction, 1.0)
+        update_job(engine, job_id, **values)
+
+    try:
+        result = work(report)
+    except Exception as e:
+        update_job(
+            engine,
+            job_id,
+            status="failed",
+            error=str(e),
+            finished_at=datetime.datetime.now(),
+        )
+    else:
+        update_job(
+            engine,
+            job_id,
+            status="succeeded",
+            progress=1.0,
+            message=None,
+            result_json=json.dumps(result, default=str),
+            finished_at=datetime.datetime.now(),
+        )
+
+
+def submit_job(db_name, kind, label, work):
+    """
+    Runs a long database operation in the background so that it neither
+    blocks the page nor is abandoned by a rerun.
+
+    The jobs of one database run one at a time, since they would only
+    contend for its write lock, and an export could read a table that a
+    migration is replacing. A job of a busy database waits in a queue of
+    its own rather than in a worker thread, so jobs of other databases run
+    in parallel, up to JOB_WORKERS. Status, progress and errors are kept in
+    the catalog.
+
+    Args:
+        db_name: Name of the database the job works on.
+        kind: Kind of job, such as "import" or "export".
+        label: Description of the job shown in the jobs panel.
+        work: A callable receiving a ``report(fraction, message)`` callable
+            for its progress. It runs in a worker thread, so it must not draw
+            Streamlit elements. Its return value must be JSON serializable
+            and is stored as the job result.
+
+    Returns:
+        The id of the job.
+    """
+    runner = get_job_runner()
+    engine = runner["engine"]
+
+    def insert():
+        with engine.begin() as connection:
+            return connection.execute(
+                jobs_table.insert().values(
+                    db_name=db_name,
+                    kind=kind,
+                    label=label,
+                    status="queued",
+                    created_at=datetime.datetime.now(),
+                )
+            ).inserted_primary_key[0]
+
+    job_id = run_with_retry(insert)
+    with runner["lock"]:
+        if db_name in runner["busy_dbs"]:
+            runner["pending"].setdefault(db_name, deque()).append((job_id, work))
+            return job_id
+        runner["busy_dbs"].add(db_name)
+    start_job(runner, job_id, db_name, work)
+    return job_id
+
+
+def job_to_dict(row):
+    job = dict(row._mapping)
+    result_json = job.pop("result_json")
+    job["result"] = json.loads(result_json) if result_json else None
+    if job["started_at"] is None:
+        job["seconds"] = None
+    else:
+        finished_at = job["finished_at"] or datetime.datetime.now()
+        job["seconds"] = (finished_at - job["started_at"]).total_seconds()
+    return job
+
+
+def get_job(job_id):
+    """
+    Returns a job as a dict, or None if it does not exist.
+
+    Returns:
+        A dict with id, db_name, kind, label, status, progress, message,
+        error, result, created_at, started_at, finished_at and seconds.
+    """
+    with get_job_runner()["engine"].connect() as connection:
+        row = connection.execute(
+            select(jobs_table).where(jobs_table.c.id == job_id)
+        ).first()
+    return job_to_dict(row) if row is not None else None
+
+
+def list_jobs(db_name, limit=JOB_HISTORY_LIMIT):
+    """
+    Returns the latest jobs of a database, newest first, see ``get_job``.
+    """
+    with get_job_runner()["engine"].connect() as connection:
+        rows = connection.execute(
+            select(jobs_table)
+            .where(jobs_table.c.db_name == db_name)
+            .order_by(jobs_table.c.id.desc())
+            .limit(limit)
+        ).all()
+    return [job_to_dict(row) for row in rows]
+
+
+def has_active_jobs(db_name):
+    """
+    Returns True if a job of the database is queued or running.
+    """
+    with get_job_runner()["engine"].connect() as connection:
+        return (
+            connection.execute(
+                select(jobs_table.c.id)
+                .where(jobs_table.c.db_name == db_name)
+                .where(jobs_table.c.status.in_(ACTIVE_JOB_STATUSES))
+                .limit(1)
+            ).first()
+            is not None
+        )
@@ -0,0 +1,90 @@
+import datetime
+import hashlib
+import json
+import threading
+import time
+
+import streamlit as st
+
+
+@st.cache_resource
+def get_model_registry():
+    """
+    Returns the process-wide registry of model classes, shared by all
+    sessions.
+    """
+    return {"models": {}, "lock": threading.Lock()}
+
+
+def get_schema_hash(model_name, schema_json, primary_keys):
+    schema = json.dumps([model_name, schema_json, primary_keys], sort_keys=True)
+    return hashlib.sha256(schema.encode()).hexdigest()
+
+
+def get_schema_model(model_name, schema_json, primary_keys, build, on_build=None):
+    """
+    Returns the model class of a schema, building it only the first time
+    the schema is used in the process or when it has changed.
+
+    Args:
+        model_name: Name of the model class.
+        schema_json: The schema, as stored in the catalog.
+        primary_keys: The primary key fields.
+        build: A callable taking no arguments that builds the model class.
+        on_build: Optional callable receiving the model class after each
+            build, e.g. to create its table.
+
+    Returns:
+        The model class.
+    """
+    registry = get_model_registry()
+    schema_hash = get_schema_hash(model_name, schema_json, primary_keys)
+
+    entry = registry["models"].get(model_name)
+    if entry is not None and entry["hash"] == schema_hash:
+        return entry["model_class"]
+
+    with registry["lock"]:
+        entry = registry["models"].get(model_name)
+        if entry is not None and entry["hash"] == schema_hash:
+            return entry["model_class"]
+
+        started = time.perf_counter()
+        model_class = build()
+        if on_build is not None:
+            on_build(model_class)
+        registry["models"][model_name] = {
+            "model_class": model_class,
+            "hash": schema_hash,
+            "build_seconds": time.perf_counter() - started,
+            "built_at": datetime.datetime.now(),
+            "builds": (entry["builds"] + 1) if entry is not None else 1,
+        }
+        return model_class
+
+
+def forget_model(model_name):
+    """
+    Drops a model from the registry, e.g. when its database is deleted, so
+    that a new database with the same name builds its model again.
+    """
+    registry = get_model_registry()
+    with registry["lock"]:
+        registry["models"].pop(model_name, None)
+
+
+def get_model_build_stats():
+    """
+    Returns the build statistics of all registered models.
+    """
+    registry = get_model_registry()
+    return [
+        {
+            "model": model_name,
+            "schema_hash": entry["hash"][:12],
+            "build_ms": entry["build_seconds"] * 1000,
+            "builds": entry["builds"],
+            "built_at": entry["built_at"],
+        }
+        for model_name, entry in list(registry["models"].items())
+    ]
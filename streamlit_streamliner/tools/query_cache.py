@@ -0,0 +1,172 @@
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+# Memory budget shared by all cached query results in the process
+QUERY_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+
+def estimate_size(value):
+    """
+    Estimates the memory used by a query result in bytes.
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pa.Table):
+        return value.get_total_buffer_size()
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(key) + estimate_size(item) for key, item in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class QueryCache:
+    """
+    A thread-safe LRU cache of query results bounded by an estimated size in
+    bytes rather than by a number of entries.
+    """
+
+    def __init__(self, max_bytes=QUERY_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key][0]
+
+    def put(self, key, value):
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            # Never worth evicting everything else for one result
+            return
+        with self.lock:
+            if key in self.entries:
+                self.current_bytes -= self.entries.pop(key)[1]
+            self.entries[key] = (value, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+    def discard(self, predicate):
+        """
+        Removes every entry whose key matches ``predicate``.
+        """
+        with self.lock:
+            for key in [key for key in self.entries if predicate(key)]:
+                self.current_bytes -= self.entries.pop(key)[1]
+
+    def stats(self):
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+@st.cache_resource
+def get_query_cache():
+    """
+    Returns the process-wide query cache and the data versions of the
+    databases, shared by all sessions.
+    """
+    return {"cache": QueryCache(), "versions": {}, "lock": threading.Lock()}
+
+
+def get_data_version(db_name):
+    return get_query_cache()["versions"].get(db_name, 0)
+
+
+def bump_data_version(db_name):
+    """
+    Marks the data of a database as changed. Must be called after every
+    write so that cached results of the old version are never served again.
+    """
+    query_cache = get_query_cache()
+    with query_cache["lock"]:
+        version = query_cache["versions"].get(db_name, 0) + 1
+        query_cache["versions"][db_name] = version
+    # Results of older versions can no longer be hit, free their memory now
+    query_cache["cache"].discard(lambda key: key[0] == db_name and key[2] < version)
+
+
+def cached_query(db_name, query_key, loader):
+    """
+    Returns the cached result of a query, running ``loader`` on a miss.
+
+    Args:
+        db_name: Name of the database the query reads.
+        query_key: A hashable description of the query shape and parameters.
+        loader: A callable taking no arguments that runs the query.
+
+    Returns:
+        The query result. It is shared between sessions and must not be
+        modified.
+    """
+    cache = get_query_cache()["cache"]
+    key = (db_name, query_key, get_data_version(db_name))
+    result = cache.get(key)
+    if result is None:
+        result = loader()
+        cache.put(key, result)
+    return result
+
+
+def cached_queries(db_name, query_keys, loader):
+    """
+    Returns the cached results of several queries, running ``loader`` once
+    for all of them that miss. Useful when one statement can answer many
+    queries, such as the statistics of several columns.
+
+    Args:
+        db_name: Name of the database the queries read.
+        query_keys: Hashable descriptions of the queries.
+        loader: A callable receiving the list of query keys that missed and
+            returning a dict of {query key: result}.
+
+    Returns:
+        A dict of {query key: result}. The results are shared between
+        sessions and must not be modified.
+    """
+    cache = get_query_cache()["cache"]
+    version = get_data_version(db_name)
+    results = {}
+    missing = []
+    for query_key in query_keys:
+        result = cache.get((db_name, query_key, version))
+        if result is None:
+            missing.append(query_key)
+        else:
+            results[query_key] = result
+    if missing:
+        loaded = loader(missing)
+        for query_key in missing:
+            cache.put((db_name, query_key, version), loaded[query_key])
+            results[query_key] = loaded[query_key]
+    return results
+
+
+def get_query_cache_stats():
+    return get_query_cache()["cache"].stats()